@@ -0,0 +1,184 @@
+"""Offline Black-Scholes pricer for large option files.
+
+Input is a CSV, .npy (structured array) or Parquet file with columns S, K, T, r, v and option_type
+('call'/'put' strings or a boolean call flag). Rows are read chunk by chunk and each chunk is priced
+with one vectorized BlackScholesModel call in a process pool. Results are written in input order to a
+memory-mapped .npy structured array, a Parquet file or a CSV file, chosen by the output extension.
+Only a bounded number of chunks is in flight at a time, so memory use depends on the chunk size and
+number of workers, not on the file size.
+
+Run:  python batch_pricer.py chain.csv priced.npy --chunk-size 250000 --workers 8
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from option_analysis import BlackScholesModel, GREEK_NAMES, _call_mask
+
+INPUT_COLUMNS = ('S', 'K', 'T', 'r', 'v', 'option_type')
+
+
+def _extension(path):
+    return os.path.splitext(path)[1].lower()
+
+
+def count_rows(path):
+    # Needed up front to size a memory-mapped output. CSV rows are counted with the same parser that reads
+    # the chunks (on one column only), so blank lines and quoted newlines are counted the same way.
+    extension = _extension(path)
+    if extension == '.npy':
+        return len(np.load(path, mmap_mode='r'))
+    if extension == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+
+    import pandas as pd
+    return sum(len(frame) for frame in pd.read_csv(path, usecols=[INPUT_COLUMNS[0]], chunksize=1_000_000))
+
+
+def read_chunks(path, chunk_size):
+    # Yield dicts of input column arrays with at most chunk_size rows each
+    extension = _extension(path)
+    if extension == '.npy':
+        table = np.load(path, mmap_mode='r')
+        for start in range(0, len(table), chunk_size):
+            rows = table[start:start + chunk_size]
+            yield {column: np.asarray(rows[column]) for column in INPUT_COLUMNS}
+    elif extension == '.parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=list(INPUT_COLUMNS)):
+            yield {column: batch.column(column).to_numpy(zero_copy_only=False) for column in INPUT_COLUMNS}
+    else:
+        import pandas as pd
+        for frame in pd.read_csv(path, usecols=list(INPUT_COLUMNS), chunksize=chunk_size):
+            yield {column: frame[column].to_numpy() for column in INPUT_COLUMNS}
+
+
+def output_fields(greeks=True):
+    return ('price', *GREEK_NAMES) if greeks else ('price',)
+
+
+def price_chunk(S, K, T, r, v, is_call, greeks=True):
+    # Price (and Greeks) of one chunk as a dict of float64 columns in output_fields order
+    model = BlackScholesModel(S, K, T, r, v, is_call)
+    if not greeks:
+        return {'price': np.asarray(model.option_price(), dtype=float)}
+    price, greek_values = model.price_and_greeks()
+    return dict(zip(output_fields(), (np.asarray(values, dtype=float) for values in (price, *greek_values))))
+
+
+class NpyWriter:
+    """Writes result chunks into a structured .npy file that is memory-mapped, not held in memory."""
+
+    def __init__(self, path, num_rows, fields):
+        dtype = np.dtype([(field, np.float64) for field in fields])
+        self.table = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(num_rows,))
+        self.position = 0
+
+    def write(self, columns):
+        n = len(next(iter(columns.values())))
+        rows = self.table[self.position:self.position + n]
+        for field, values in columns.items():
+            rows[field] = values
+        self.position += n
+
+    def close(self):
+        self.table.flush()
+        del self.table
+
+
+class ParquetWriter:
+    """Appends each result chunk as a row group of a Parquet file."""
+
+    def __init__(self, path, num_rows, fields):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.writer = pq.ParquetWriter(path, pa.schema([(field, pa.float64()) for field in fields]))
+
+    def write(self, columns):
+        self.writer.write_table(self.pa.table(columns))
+
+    def close(self):
+        self.writer.close()
+
+
+class CsvWriter:
+    def __init__(self, path, num_rows, fields):
+        self.file = open(path, 'w')
+        self.file.write(','.join(fields) + '\n')
+
+    def write(self, columns):
+        np.savetxt(self.file, np.column_stack(list(columns.values())), delimiter=',', fmt='%.10g')
+
+    def close(self):
+        self.file.close()
+
+
+WRITERS = {'.npy': NpyWriter, '.parquet': ParquetWriter, '.csv': CsvWriter}
+
+
+def price_file(input_path, output_path, chunk_size=250_000, workers=None, greeks=True):
+    # Stream input_path through the pricer into output_path; returns the number of rows priced
+    writer_class = WRITERS.get(_extension(output_path))
+    if writer_class is None:
+        raise ValueError(f"output must end in one of {', '.join(WRITERS)}")
+    num_rows = count_rows(input_path) if writer_class is NpyWriter else None
+    writer = writer_class(output_path, num_rows, output_fields(greeks))
+    workers = workers or os.cpu_count()
+
+    def jobs():
+        for columns in read_chunks(input_path, chunk_size):
+            yield (*(np.asarray(columns[name], dtype=float) for name in INPUT_COLUMNS[:-1]),
+                   np.broadcast_to(_call_mask(columns['option_type']), len(columns['S'])))
+
+    rows = 0
+
+    def write(result):
+        nonlocal rows
+        writer.write(result)
+        rows += len(result['price'])
+
+    try:
+        if workers == 1:
+            for job in jobs():
+                write(price_chunk(*job, greeks=greeks))
+        else:
+            # At most two chunks per worker in flight: enough to keep every core busy while results are
+            # written in order, and it bounds memory regardless of how much input remains
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for job in jobs():
+                    pending.append(executor.submit(price_chunk, *job, greeks=greeks))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        writer.close()
+    if num_rows is not None and rows != num_rows:
+        raise ValueError(f'{output_path} was sized for {num_rows} rows but {rows} were priced')
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch Black-Scholes pricer for large option files')
+    parser.add_argument('input', help='CSV, .npy or .parquet file with S, K, T, r, v, option_type columns')
+    parser.add_argument('output', help='.npy (memory-mapped), .parquet or .csv result file')
+    parser.add_argument('--chunk-size', type=int, default=250_000)
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('--no-greeks', action='store_true', help='write prices only')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = price_file(args.input, args.output, args.chunk_size, args.workers, not args.no_greeks)
+    elapsed = time.perf_counter() - start
+    print(f"Priced {rows:,} options in {elapsed:.2f} s ({rows / elapsed:,.0f} options/s) -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Compare the batch implied-vol solver with a per-option scipy.optimize loop.
+
+Run from the repository root:  python -m benchmarks.implied_volatility_benchmark
+"""
+import time
+
+import numpy as np
+from scipy.optimize import brentq
+
+from option_analysis import BlackScholesModel
+from implied_volatility import implied_volatility
+
+
+def make_chain(n, seed=0):
+    rng = np.random.default_rng(seed)
+    S = np.full(n, 100.0)
+    K = rng.uniform(60.0, 140.0, n)
+    T = rng.uniform(0.05, 3.0, n)
+    r = rng.uniform(0.0, 0.08, n)
+    v = rng.uniform(0.05, 1.0, n)
+    option_type = np.where(rng.random(n) < 0.5, 'call', 'put')
+    model = BlackScholesModel(S, K, T, r, v, option_type)
+    return model.option_price(), S, K, T, r, v, option_type, model.greeks()[3]
+
+
+def scipy_loop(price, S, K, T, r, option_type):
+    vols = np.empty(len(price))
+    for i in range(len(price)):
+        objective = lambda vol: BlackScholesModel(S[i], K[i], T[i], r[i], vol, option_type[i]).option_price() - price[i]
+        vols[i] = brentq(objective, 1e-6, 5.0, xtol=1e-10)
+    return vols
+
+
+def check_vol_bounds():
+    # Quotes priced with a volatility outside vol_bounds must not be reported as converged
+    S, K, T, r = 100.0, 100.0, 1.0, 0.03
+    for v in (6.0, 1e-7):
+        price = BlackScholesModel(S, K, T, r, v, 'call').option_price()
+        vol, converged, _ = implied_volatility(price, S, K, T, r, 'call', vol_bounds=(1e-6, 5.0))
+        assert not converged and np.isnan(vol), f"quote at v={v} reported as vol={vol}, converged={converged}"
+
+
+def main():
+    check_vol_bounds()
+    for n in (100, 1000, 10000):
+        price, S, K, T, r, v, option_type, vega = make_chain(n)
+
+        start = time.perf_counter()
+        vols, converged, iterations = implied_volatility(price, S, K, T, r, option_type)
+        batch_time = time.perf_counter() - start
+
+        loop_n = min(n, 1000)  # the scalar loop is timed on a subset and scaled up
+        start = time.perf_counter()
+        scipy_loop(price[:loop_n], S[:loop_n], K[:loop_n], T[:loop_n], r[:loop_n], option_type[:loop_n])
+        loop_time = (time.perf_counter() - start) * n / loop_n
+
+        # Quotes with (numerically) no time value carry no volatility information
+        identifiable = vega > 1e-4
+        print(f"n={n:>6}  batch {batch_time * 1e3:9.2f} ms  scipy loop {loop_time * 1e3:10.2f} ms  "
+              f"speedup {loop_time / batch_time:7.1f}x  converged {converged.mean():.2%}  "
+              f"max iters {iterations.max()}  max |vol err| {np.max(np.abs(vols - v)[identifiable]):.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Lattice engine accuracy against Black-Scholes and steps-per-second throughput.
+
+Run from the repository root:  python -m benchmarks.lattice_benchmark
+"""
+import time
+
+import numpy as np
+
+from lattice import LatticeOptionPricing
+from option_analysis import BlackScholesModel
+
+
+def main(num_options=1000):
+    rng = np.random.default_rng(0)
+    S = np.full(num_options, 100.0)
+    K = rng.uniform(80.0, 120.0, num_options)
+    T = rng.uniform(0.1, 2.0, num_options)
+    r = rng.uniform(0.0, 0.06, num_options)
+    v = rng.uniform(0.1, 0.5, num_options)
+    option_type = rng.random(num_options) < 0.5
+    exact = BlackScholesModel(S, K, T, r, v, option_type).option_price()
+
+    print(f"{num_options} options per batch")
+    for method in ('binomial', 'trinomial'):
+        for steps in (100, 500, 1000):
+            for american in (False, True):
+                lattice = LatticeOptionPricing(S, K, T, r, v, option_type, steps, american, method)
+                start = time.perf_counter()
+                price = lattice.option_price()
+                elapsed = time.perf_counter() - start
+                error = f"max |err vs BS| {np.max(np.abs(price - exact)):.2e}" if not american else ''
+                print(f"  {method:<9} N={steps:<5} {'American' if american else 'European':<9} {elapsed * 1e3:8.1f} ms  "
+                      f"{num_options * steps / elapsed / 1e6:7.2f} M option-steps/s  {error}")
+
+    lattice = LatticeOptionPricing(S, K, T, r, v, option_type, american=False, method='trinomial')
+    start = time.perf_counter()
+    price, steps = lattice.richardson_price(tol=1e-4)
+    elapsed = time.perf_counter() - start
+    print(f"  Richardson (trinomial, tol 1e-4): {steps} steps, {elapsed * 1e3:.1f} ms, "
+          f"max |err vs BS| {np.max(np.abs(price - exact)):.2e}")
+
+
+if __name__ == '__main__':
+    main()
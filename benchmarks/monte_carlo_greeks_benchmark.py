@@ -0,0 +1,30 @@
+"""Check single-pass Monte Carlo Greeks against BlackScholesModel.greeks() and time each method.
+
+Run from the repository root:  python -m benchmarks.monte_carlo_greeks_benchmark
+"""
+import time
+
+from monte_carlo import MonteCarloOptionPricing
+from option_analysis import BlackScholesModel
+
+GREEKS = ('delta', 'gamma', 'theta', 'vega', 'rho')
+
+
+def main(num_simulations=1_000_000):
+    S, K, T, r, v = 100.0, 105.0, 0.75, 0.04, 0.25
+    for option_type in ('call', 'put'):
+        exact = BlackScholesModel(S, K, T, r, v, option_type).greeks()
+        print(f"{option_type} option, {num_simulations} paths")
+        print(f"  {'':<17}" + ''.join(f"{greek:>12}" for greek in GREEKS) + f"{'time':>10}")
+        print(f"  {'Black-Scholes':<17}" + ''.join(f"{value:12.5f}" for value in exact))
+        # A European payoff only needs the terminal step, so the bump method runs on single-step paths too
+        mc = MonteCarloOptionPricing(S, K, T, r, v, option_type, num_simulations, num_steps=1)
+        for method in ('pathwise', 'likelihood_ratio', 'bump'):
+            start = time.perf_counter()
+            estimates = mc.greeks(method=method)
+            elapsed = time.perf_counter() - start
+            print(f"  {method:<17}" + ''.join(f"{value:12.5f}" for value in estimates) + f"{elapsed:9.3f}s")
+
+
+if __name__ == '__main__':
+    main()
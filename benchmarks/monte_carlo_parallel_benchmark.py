@@ -0,0 +1,30 @@
+"""Scaling of MonteCarloOptionPricing.simulate_parallel with worker count.
+
+Run from the repository root:  python -m benchmarks.monte_carlo_parallel_benchmark
+"""
+import os
+import time
+
+from monte_carlo import MonteCarloOptionPricing
+from option_analysis import BlackScholesModel
+
+
+def main(num_simulations=20_000_000, chunk_size=1_000_000):
+    S, K, T, r, v = 100.0, 100.0, 1.0, 0.05, 0.2
+    mc = MonteCarloOptionPricing(S, K, T, r, v, 'call', num_simulations)
+    exact = BlackScholesModel(S, K, T, r, v, 'call').option_price()
+
+    baseline = None
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for num_workers in worker_counts:
+        start = time.perf_counter()
+        price = mc.simulate_parallel(num_workers=num_workers, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or (price, elapsed)
+        print(f"workers={num_workers:>3}  {elapsed:7.2f} s  {num_simulations / elapsed / 1e6:7.2f} M paths/s  "
+              f"speedup {baseline[1] / elapsed:5.2f}x  price {price:.6f} (BS {exact:.6f})  "
+              f"identical to 1 worker: {price == baseline[0]}")
+
+
+if __name__ == '__main__':
+    main()
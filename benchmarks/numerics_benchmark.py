@@ -0,0 +1,35 @@
+"""Per-call latency of each numerics backend, alone and inside BlackScholesModel.
+
+Run from the repository root:  python -m benchmarks.numerics_benchmark
+"""
+import timeit
+
+import numpy as np
+
+import numerics
+from option_analysis import BlackScholesModel
+
+
+def latency(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main(batch_size=1_000_000):
+    x_scalar = 0.3
+    x_batch = np.random.default_rng(0).standard_normal(batch_size)
+    batch = dict(S=np.full(batch_size, 300.0), K=np.linspace(50.0, 550.0, batch_size), T=1.0, r=0.03, v=0.15)
+
+    print(f"{'backend':<8}{'cdf scalar':>14}{'cdf 1e6':>14}{'model scalar':>16}{'model 1e6':>14}")
+    for backend in numerics.BACKENDS:
+        numerics.set_backend(backend)
+        numerics.norm_cdf(x_batch)  # trigger any JIT compilation before timing
+        cdf_scalar = latency(lambda: numerics.norm_cdf(x_scalar), 2000)
+        cdf_batch = latency(lambda: numerics.norm_cdf(x_batch), 5)
+        model_scalar = latency(lambda: BlackScholesModel(300.0, 250.0, 1.0, 0.03, 0.15, 'call').price_and_greeks(), 1000)
+        model_batch = latency(lambda: BlackScholesModel(**batch, option_type='call').price_and_greeks(), 3)
+        print(f"{backend:<8}{cdf_scalar * 1e6:11.2f} us{cdf_batch * 1e3:11.2f} ms"
+              f"{model_scalar * 1e6:13.2f} us{model_batch * 1e3:11.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Load test for pricing_service.py: latency percentiles and throughput under concurrent clients.
+
+Start the service first (python pricing_service.py --port 8000), then from the repository root:
+
+    python -m benchmarks.pricing_service_load_test --requests 20000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+
+async def client(host, port, path, payloads, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for payload in payloads:
+            body = json.dumps(payload).encode()
+            start = time.perf_counter()
+            writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            await reader.readline()  # status line
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run(host, port, path, num_requests, concurrency):
+    rng = np.random.default_rng(0)
+    payloads = [{'S': 100.0, 'K': float(k), 'T': float(t), 'r': 0.03, 'v': float(v),
+                 'option_type': 'call' if call else 'put'}
+                for k, t, v, call in zip(rng.uniform(60, 140, num_requests), rng.uniform(0.05, 2, num_requests),
+                                         rng.uniform(0.1, 0.6, num_requests), rng.random(num_requests) < 0.5)]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, path, payloads[i::concurrency], latencies) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1e3
+    print(f"{path}: {len(latencies)} requests, concurrency {concurrency}: {len(latencies) / elapsed:,.0f} req/s, "
+          f"p50 {np.percentile(latencies, 50):.2f} ms, p99 {np.percentile(latencies, 99):.2f} ms, "
+          f"max {latencies.max():.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--path', default='/greeks', choices=('/price', '/greeks'))
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.path, args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Benchmark suite for the pricing, sensitivity and Monte Carlo hot paths.
+
+Records throughput (items per second, best of --repeat runs) and peak traced memory for each case.
+Results can be saved as a JSON baseline and later runs compared against it; the run exits with
+status 1 when any case's throughput falls by more than --threshold relative to the baseline.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --save benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json --threshold 0.2
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from monte_carlo import MonteCarloOptionPricing
+from option_analysis import BlackScholesModel, OptionPlotter, run_sensitivity_analysis
+from portfolio import OptionPortfolio
+
+PARAMS = dict(S=300.0, K=250.0, T=1.0, r=0.03, v=0.15)
+
+
+def batch_inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return dict(S=rng.uniform(50.0, 350.0, n), K=rng.uniform(50.0, 350.0, n), T=rng.uniform(0.05, 3.0, n),
+                r=rng.uniform(0.0, 0.08, n), v=rng.uniform(0.05, 1.0, n),
+                option_type=rng.random(n) < 0.5)
+
+
+def scalar_case(n):
+    def run():
+        for _ in range(n):
+            model = BlackScholesModel(**PARAMS, option_type='call')
+            model.option_price()
+            model.greeks()
+    return run
+
+
+def batch_case(n):
+    inputs = batch_inputs(n)
+
+    def run():
+        BlackScholesModel(**inputs).price_and_greeks()
+    return run
+
+
+def plotter_case():
+    plotter = OptionPlotter(**PARAMS, option_type='call', x_variable='S', x_values=np.linspace(50.0, 350.0, 100))
+    return plotter.generate_values
+
+
+def sensitivity_case(variable):
+    return lambda: run_sensitivity_analysis(**PARAMS, option_type='call', sensitivity_variable=variable)
+
+
+def simulate_case(num_paths):
+    mc = MonteCarloOptionPricing(**PARAMS, option_type='call', num_simulations=num_paths)
+    return mc.simulate
+
+
+def paths_case(num_paths, num_steps):
+    mc = MonteCarloOptionPricing(**PARAMS, option_type='call', num_simulations=num_paths, num_steps=num_steps)
+    return mc.generate_paths
+
+
+def portfolio_update_case(n, num_underlyings=10):
+    inputs = batch_inputs(n)
+    underlying = np.arange(n) % num_underlyings
+    book = OptionPortfolio(underlying, quantity=1.0, **inputs)
+    return lambda: book.update_underlying(0, spot=310.0)
+
+
+def build_cases(max_batch, max_paths):
+    # (name, items processed per run, callable)
+    cases = [('black_scholes.scalar[1000]', 1000, scalar_case(1000))]
+    n = 1
+    while n <= max_batch:
+        cases.append((f'black_scholes.batch[{n}]', n, batch_case(n)))
+        n *= 10
+    cases.append(('portfolio.update_underlying[100000 rows / 10]', 10000, portfolio_update_case(100000)))
+    cases.append(('option_plotter.generate_values[100]', 100, plotter_case()))
+    for variable in ('Spot Price', 'Volatility'):
+        cases.append((f'run_sensitivity_analysis[{variable}]', 100, sensitivity_case(variable)))
+    n = 1000
+    while n <= max_paths:
+        cases.append((f'monte_carlo.simulate[{n}]', n, simulate_case(n)))
+        cases.append((f'monte_carlo.generate_paths[{n}x252]', n * 252, paths_case(n, 252)))
+        n *= 10
+    return cases
+
+
+def measure(fn, items, repeat):
+    fn()  # warm-up
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    # Memory is traced in a separate run so tracing overhead does not distort the timings
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'items': items, 'seconds': best, 'throughput': items / best, 'peak_memory_bytes': peak}
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        change = result['throughput'] / baseline[name]['throughput'] - 1
+        flag = ''
+        if change < -threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"  {name:<42} {change:+8.1%} throughput vs baseline{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-batch', type=int, default=10**6, help='largest batch size (use 10000000 for 10^7)')
+    parser.add_argument('--max-paths', type=int, default=10**5, help='largest Monte Carlo path count')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this string')
+    parser.add_argument('--save', help='write results to this JSON baseline file')
+    parser.add_argument('--compare', help='compare against this JSON baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed fractional throughput drop')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, items, fn in build_cases(args.max_batch, args.max_paths):
+        if args.filter not in name:
+            continue
+        results[name] = measure(fn, items, args.repeat)
+        result = results[name]
+        print(f"{name:<44} {result['throughput']:14,.0f} items/s  {result['seconds'] * 1e3:10.3f} ms  "
+              f"peak {result['peak_memory_bytes'] / 2**20:9.2f} MiB")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'machine': platform.platform(), 'python': platform.python_version(),
+                       'numpy': np.__version__, 'results': results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Cold-start report for the Streamlit app: module import times and first-render time.
+
+Each measurement runs in a fresh interpreter so nothing is already imported.
+
+Run from the repository root:  python -m benchmarks.startup_benchmark
+"""
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ('sympy', 'sympy.stats', 'scipy.stats', 'plotly.graph_objects', 'pandas', 'numba')
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+RENDER_PROBE = """
+import json, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('streamlit_app.py', default_timeout=300)
+at.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - start
+print(json.dumps({'first_render': first, 'rerun': rerun, 'exceptions': len(at.exception)}))
+"""
+
+
+def run_probe(code):
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    print('Import time (fresh interpreter)')
+    for module in ('numerics', 'option_analysis', 'monte_carlo', 'description', 'pricing_cache'):
+        result = run_probe(IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES))
+        print(f"  {module:<16} {result['seconds'] * 1e3:8.1f} ms  heavy modules loaded: "
+              f"{', '.join(result['loaded']) or 'none'}")
+
+    result = run_probe(RENDER_PROBE)
+    print(f"App first render (incl. imports) {result['first_render']:.2f} s, warm rerun {result['rerun']:.2f} s, "
+          f"exceptions: {result['exceptions']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Variance-reduction factor and paths/second of each Monte Carlo estimator.
+
+The factor is the plain-MC variance divided by the estimator's variance at the same number of
+simulated paths (antithetic runs num_simulations / 2 pairs), so an estimator with factor F needs
+roughly 1/F as many paths for the same standard error. Each estimator runs once untimed first, so
+import and first-call costs are not counted.
+
+Run from the repository root:  python -m benchmarks.variance_reduction_benchmark
+"""
+import time
+
+import numpy as np
+
+from monte_carlo import MonteCarloOptionPricing
+
+
+def plain_mc(mc):
+    rng = np.random.default_rng(mc.seed)
+    z = rng.standard_normal(mc.num_simulations)
+    ST = mc.S * np.exp((mc.r - 0.5 * mc.v**2) * mc.T + mc.v * np.sqrt(mc.T) * z)
+    payoffs = np.exp(-mc.r * mc.T) * (np.maximum(ST - mc.K, 0) if mc.option_type == 'call' else np.maximum(mc.K - ST, 0))
+    return payoffs.mean(), payoffs.std(ddof=1) / np.sqrt(len(payoffs)), None, mc.num_simulations
+
+
+def main(num_simulations=2 ** 20):
+    estimators = {
+        'plain MC': plain_mc,
+        'antithetic (streaming)': lambda mc: mc.simulate_streaming(chunk_size=2 ** 17,
+                                                                   max_paths=mc.num_simulations // 2),
+        'control variate (spot)': lambda mc: mc.simulate_control_variate(control='spot'),
+        'scrambled Sobol RQMC': lambda mc: mc.simulate_sobol(num_randomizations=16),
+    }
+    for option_type in ('call', 'put'):
+        mc = MonteCarloOptionPricing(100.0, 100.0, 1.0, 0.05, 0.2, option_type, num_simulations)
+        plain_std_error = None
+        print(f"{option_type} option, {num_simulations} paths")
+        for name, estimator in estimators.items():
+            estimator(MonteCarloOptionPricing(100.0, 100.0, 1.0, 0.05, 0.2, option_type, 2 ** 12))  # warm-up
+            start = time.perf_counter()
+            price, std_error = estimator(mc)[:2]
+            elapsed = time.perf_counter() - start
+            plain_std_error = plain_std_error or std_error
+            print(f"  {name:<24} price {price:9.5f}  std err {std_error:.2e}  "
+                  f"VRF {(plain_std_error / std_error) ** 2:8.1f}  {num_simulations / elapsed / 1e6:6.2f} M paths/s")
+
+
+if __name__ == '__main__':
+    main()
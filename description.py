@@ -1,7 +1,28 @@
-import sympy as sp
-from sympy.stats import Normal, cdf
+from functools import lru_cache
+
 import streamlit as st
 
+
+@lru_cache(maxsize=None)
+def black_scholes_symbolic():
+    # Symbolic Black-Scholes model, built once per process; sympy is only imported when this is first called
+    import sympy as sp
+    from sympy.stats import Normal, cdf
+
+    S, K, T, r, v = sp.symbols('S K T r v')
+    d1 = (sp.log(S/K) + (r + 0.5 * v**2) * T) / (v * sp.sqrt(T))
+    d2 = d1 - v * sp.sqrt(T)
+
+    # Define a standard normal distribution
+    X = Normal('X', 0, 1)
+
+    # Black-Scholes Call and Put formulas
+    BS_call = S * cdf(X)(d1) - K * sp.exp(-r * T) * cdf(X)(d2)
+    BS_put = K * sp.exp(-r * T) * cdf(X)(-d2) - S * cdf(X)(-d1)
+
+    return {'symbols': (S, K, T, r, v), 'd1': d1, 'd2': d2, 'call': BS_call, 'put': BS_put}
+
+
 def description_page():
     st.title('Greeks and Black-Scholes Model Explanation')
 
@@ -18,19 +39,7 @@ def description_page():
         "all available information."
     )
 
-    # Black-Scholes Formula
-    S, K, T, r, v = sp.symbols('S K T r v')
-    d1 = (sp.log(S/K) + (r + 0.5 * v**2) * T) / (v * sp.sqrt(T))
-    d2 = d1 - v * sp.sqrt(T)
-
-    # Define a standard normal distribution
-    X = Normal('X', 0, 1)
-
-    # Black-Scholes Call and Put formulas
-    BS_call = S * cdf(X)(d1) - K * sp.exp(-r * T) * cdf(X)(d2)
-    BS_put = K * sp.exp(-r * T) * cdf(X)(-d2) - S * cdf(X)(-d1)
-
-    # Display the Black-Scholes formulas symbolically
+    # Display the Black-Scholes formulas; the page only needs the LaTeX, not the symbolic model
     st.write("### Black-Scholes Formula")
     st.latex(r"Call: \text{C} = S \cdot N(d_1) - K e^{-rT} N(d_2)")
     st.latex(r"Put: \text{P} = K e^{-rT} N(-d_2) - S \cdot N(-d_1)")
@@ -0,0 +1,55 @@
+# Generated by higher_order_greeks.py (fingerprint 71d4569ee1022a98); do not edit.
+from numpy import exp, log, sqrt
+from scipy.constants import pi
+
+
+def higher_order_greeks(S, K, T, r, v):
+    # Returns (vanna, volga, charm, speed, zomma, color)
+    x0 = T**(-1.0)
+    x1 = v**2
+    x2 = r + 0.5*x1
+    x3 = T*x2 + log(S/K)
+    x4 = x3**2
+    x5 = x1**(-1.0)
+    x6 = (1/2)*x5
+    x7 = exp(-x0*x4*x6)
+    x8 = sqrt(T)
+    x9 = x8**(-1.0)
+    x10 = x5*x9
+    x11 = S**(-1.0)
+    x12 = v**(-1.0)
+    x13 = x3*x9
+    x14 = v*x8 - x12*x13
+    x15 = x14**2
+    x16 = (1/2)*x15
+    x17 = exp(-x16)
+    x18 = exp(-T*r)
+    x19 = K*x17*x18
+    x20 = x11*x19
+    x21 = x10*x3
+    x22 = -x21
+    x23 = x7*(x22 + 1.0*x8)
+    x24 = x0*x3
+    x25 = -x24*x5 + 1.0
+    x26 = x25*x7
+    x27 = v**(-3.0)
+    x28 = x14*x20
+    x29 = sqrt(2)/sqrt(pi)
+    x30 = x12*x29
+    x31 = T**(-3/2)
+    x32 = x31*x7
+    x33 = 2*r
+    x34 = 1.0*x1 - x24 + x33
+    x35 = x7*x9
+    x36 = x32*x5
+    x37 = x3*x34*x36
+    x38 = x20*x31
+    x39 = x20*x9
+    x40 = 2*x2
+    x41 = x12*x24
+    x42 = v - x12*x40 + x41
+    x43 = x0*x28*x42 + x33*x39 + x38
+    x44 = (1/4)*x30
+    x45 = T**(-5/2)
+    x46 = v**(-4.0)
+    return ((1/2)*x29*(x10*x20 - x10*x7 - x21*x26 + x23 + x24*x27*x28), x30*(0.5*K*x17*x18*x8 - 1/2*S*x23*x25*x3 - S*x7*(x22 + 0.5*x8) - 1/2*x0*x14*x19*x27*x4 - x19*x21), -x44*(-x32 + x34*x35 - x37 + x43), x30*((3/2)*K*x0*x11*x12*x14*x17*x18 + (1/2)*K*x11*x17*x18*x31*x5 - x16*x38*x5 - x32*x6 - 1/2*x35 - x39 + (1/2)*x4*x45*x46*x7)/S**2, x11*x29*x5*(K*x0*x11*x12*x14*x17*x18 + (1/2)*K*x11*x15*x17*x18*x3*x31*x5 - 1/2*x13*x26 + (1/2)*x25*x31*x4*x5*x7 - 1/2*x28*x41 + (3/2)*x3*x31*x5*x7 - x3*x38*x6 - 1.0*x35 - 1/2*x39), -x11*x44*(2*K*r*x0*x11*x12*x14*x17*x18 + K*x11*x12*x15*x17*x18*x31*x42 + 2*K*x11*x12*x14*x17*x18/T**2 - x12*x38*x42 + 3*x3*x45*x5*x7 - x32 + x34*x4*x45*x46*x7 - x36*x40 - x37 - x43))
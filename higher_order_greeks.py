@@ -0,0 +1,150 @@
+import ast
+import glob
+import hashlib
+import importlib.util
+import os
+import tempfile
+
+import numpy as np
+
+# Greek name -> derivative of the price, as (variable, order) pairs, and the sign applied to it. charm and
+# color are rates of change per year of calendar time (-d/dT), matching the theta convention of
+# BlackScholesModel.greeks.
+HIGHER_ORDER_GREEKS = {
+    'vanna': ((('S', 1), ('v', 1)), 1),
+    'volga': ((('v', 2),), 1),
+    'charm': ((('S', 1), ('T', 1)), -1),
+    'speed': ((('S', 3),), 1),
+    'zomma': ((('S', 2), ('v', 1)), 1),
+    'color': ((('S', 2), ('T', 1)), -1),
+}
+HIGHER_ORDER_GREEK_NAMES = tuple(HIGHER_ORDER_GREEKS)
+
+# Bump to force regeneration of cached kernels when the generator itself changes
+CODEGEN_VERSION = 1
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Kernels shipped with the source tree (written by `python higher_order_greeks.py`), so a fresh install
+# never needs sympy. A kernel is only generated at runtime if the shipped one is stale, and then it is
+# cached in CODEGEN_DIR, or, if that cannot be written, in a private temporary directory for this process.
+SHIPPED_DIR = os.path.join(SOURCE_DIR, 'generated')
+CODEGEN_DIR = os.environ.get('BSM_CODEGEN_DIR', os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')), 'black_scholes', 'codegen'))
+
+_kernel = None
+
+
+def _symbolic_model_source():
+    # Source of description.black_scholes_symbolic(), read without importing description (and streamlit)
+    with open(os.path.join(SOURCE_DIR, 'description.py')) as f:
+        source = f.read()
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.FunctionDef) and node.name == 'black_scholes_symbolic':
+            return ast.get_source_segment(source, node)
+    raise LookupError('description.black_scholes_symbolic not found')
+
+
+def _fingerprint():
+    # Identifies the generator version, Greek definitions and symbolic model a kernel was built from
+    key = repr((CODEGEN_VERSION, HIGHER_ORDER_GREEKS, _symbolic_model_source()))
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def generate_source():
+    # Differentiate the symbolic call price from description.black_scholes_symbolic() and print all Greeks
+    # as one NumPy function sharing common subexpressions. Every Greek here differentiates twice in S, or
+    # in S and then v or T, or twice in v; put-call parity C - P = S - K exp(-rT) is linear in S and free
+    # of v, so these Greeks are the same for calls and puts and one kernel serves both.
+    import sympy as sp
+    from sympy.printing.numpy import SciPyPrinter
+
+    from description import black_scholes_symbolic
+
+    model = black_scholes_symbolic()
+    symbols = dict(zip('SKTrv', model['symbols']))
+    expressions = []
+    for derivatives, sign in HIGHER_ORDER_GREEKS.values():
+        variables = [(symbols[name], order) for name, order in derivatives]
+        expressions.append(sign * sp.diff(model['call'], *variables))
+
+    replacements, reduced = sp.cse(expressions)
+    printer = SciPyPrinter({'fully_qualified_modules': False})
+    body = [f'    {symbol} = {printer.doprint(expression)}' for symbol, expression in replacements]
+    body.append('    return (' + ', '.join(printer.doprint(expression) for expression in reduced) + ')')
+
+    imports = [f"from {module} import {', '.join(sorted(names))}"
+               for module, names in sorted(printer.module_imports.items())]
+    return '\n'.join([
+        f'# Generated by higher_order_greeks.py (fingerprint {_fingerprint()}); do not edit.',
+        *imports,
+        '',
+        '',
+        'def higher_order_greeks(S, K, T, r, v):',
+        f"    # Returns ({', '.join(HIGHER_ORDER_GREEK_NAMES)})",
+        *body,
+        '',
+    ])
+
+
+def _kernel_name():
+    return f'bs_higher_order_greeks_{_fingerprint()}.py'
+
+
+def _write(directory, source):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, _kernel_name())
+    # Write then rename so a concurrent loader never sees a half-written file
+    with open(path + '.tmp', 'w') as f:
+        f.write(source)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def build(force=False):
+    # Path of an up-to-date kernel: the shipped one, else a cached one, else a newly generated one
+    name = _kernel_name()
+    for directory in (SHIPPED_DIR, CODEGEN_DIR):
+        if not force and os.path.exists(os.path.join(directory, name)):
+            return os.path.join(directory, name)
+
+    source = generate_source()
+    try:
+        return _write(CODEGEN_DIR, source)
+    except OSError:
+        # Read-only home or cache directory: use a fresh mode-0700 directory that only this process
+        # writes to, never a shared temp path another user could have planted a kernel in
+        return _write(tempfile.mkdtemp(prefix='black_scholes_codegen_'), source)
+
+
+def ship():
+    # Regenerate the kernel shipped in SHIPPED_DIR and remove stale ones
+    path = _write(SHIPPED_DIR, generate_source())
+    for stale in glob.glob(os.path.join(SHIPPED_DIR, 'bs_higher_order_greeks_*.py')):
+        if stale != path:
+            os.remove(stale)
+    return path
+
+
+def load_kernel():
+    # Import the cached kernel, generating it first if needed; sympy is only imported on that first build
+    global _kernel
+    if _kernel is None:
+        path = build()
+        spec = importlib.util.spec_from_file_location('bs_higher_order_greeks', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _kernel = module.higher_order_greeks
+    return _kernel
+
+
+def higher_order_greeks(S, K, T, r, v):
+    # Vanna, volga, charm, speed, zomma and color for broadcastable inputs, in HIGHER_ORDER_GREEK_NAMES order
+    S, K, T, r, v = (np.asarray(x, dtype=float) for x in (S, K, T, r, v))
+    greeks = np.broadcast_arrays(*load_kernel()(S, K, T, r, v))
+    return tuple(greek[()] for greek in greeks)
+
+
+if __name__ == '__main__':
+    # Regenerate the shipped kernel after changing the Greeks or the symbolic model
+    print(ship())
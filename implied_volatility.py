@@ -0,0 +1,95 @@
+import numpy as np
+from option_analysis import BlackScholesModel, _call_mask
+
+
+def _initial_guess(price, S, K, T, r, is_call):
+    # Corrado-Miller approximation on the call-equivalent price (put-call parity for puts)
+    X = K * np.exp(-r * T)
+    call_price = np.where(is_call, price, price + S - X)
+    half_moneyness = (S - X) / 2
+    root = np.sqrt(np.maximum((call_price - half_moneyness)**2 - (S - X)**2 / np.pi, 0.0))
+    guess = np.sqrt(2 * np.pi / T) / (S + X) * (call_price - half_moneyness + root)
+
+    # Brenner-Subrahmanyam where Corrado-Miller degenerates
+    fallback = np.sqrt(2 * np.pi / T) * call_price / S
+    return np.where(np.isfinite(guess) & (guess > 0), guess, fallback)
+
+
+def implied_volatility(price, S, K, T, r, option_type='put', tol=1e-8, max_iter=50, vol_bounds=(1e-6, 5.0)):
+    """Invert BlackScholesModel for volatility over whole arrays of market quotes.
+
+    Each row starts from a Corrado-Miller guess and takes Newton steps with the model's analytic
+    vega, falling back to bisection inside a per-row bracket whenever a step would leave it.
+    Rows still unconverged after max_iter Newton steps are finished by pure bisection.
+    A row is converged only when its model price is within tol of the quote. Quotes outside the
+    no-arbitrage bounds, or whose volatility lies outside vol_bounds, come back as NaN with
+    converged=False.
+
+    Returns (vols, converged, iterations), each broadcast to the shape of the inputs.
+    """
+    price, S, K, T, r = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (price, S, K, T, r)))
+    is_call = np.broadcast_to(_call_mask(option_type), price.shape)
+    shape = price.shape
+    price, S, K, T, r, is_call = (np.ravel(x) for x in (price, S, K, T, r, is_call))
+
+    discount = np.exp(-r * T)
+    lower = np.where(is_call, np.maximum(S - K * discount, 0.0), np.maximum(K * discount - S, 0.0))
+    upper = np.where(is_call, S, K * discount)
+    valid = (T > 0) & (price > lower) & (price < upper)
+
+    vol_low, vol_high = vol_bounds
+    lo = np.full(price.shape, vol_low)
+    hi = np.full(price.shape, vol_high)
+    vols = np.full(price.shape, np.nan)
+    converged = np.zeros(price.shape, dtype=bool)
+    iterations = np.zeros(price.shape, dtype=int)
+
+    vols[valid] = np.clip(_initial_guess(price[valid], S[valid], K[valid], T[valid], r[valid], is_call[valid]),
+                          vol_low, vol_high)
+
+    # Safeguarded Newton on the rows that are still active
+    active = np.flatnonzero(valid)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        model = BlackScholesModel(S[active], K[active], T[active], r[active], vols[active], is_call[active])
+        diff = model.option_price() - price[active]
+        iterations[active] += 1
+
+        done = np.abs(diff) < tol
+        converged[active[done]] = True
+
+        # Price is increasing in vol, so the sign of the error tightens the bracket
+        hi[active] = np.where(diff > 0, vols[active], hi[active])
+        lo[active] = np.where(diff < 0, vols[active], lo[active])
+
+        vega = model.greeks()[3]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = vols[active] - diff / vega
+        midpoint = (lo[active] + hi[active]) / 2
+        outside = ~np.isfinite(step) | (step <= lo[active]) | (step >= hi[active])
+        vols[active] = np.where(done, vols[active], np.where(outside, midpoint, step))
+        active = active[~done]
+
+    # Bisection fallback for whatever Newton did not finish. The bracket is narrowed down to float
+    # resolution, so a quote that is matchable inside vol_bounds always gets within tol of its price.
+    for _ in range(200):
+        if active.size == 0:
+            break
+        vols[active] = (lo[active] + hi[active]) / 2
+        model = BlackScholesModel(S[active], K[active], T[active], r[active], vols[active], is_call[active])
+        diff = model.option_price() - price[active]
+        iterations[active] += 1
+
+        matched = np.abs(diff) < tol
+        converged[active[matched]] = True
+        hi[active] = np.where(diff > 0, vols[active], hi[active])
+        lo[active] = np.where(diff < 0, vols[active], lo[active])
+        collapsed = hi[active] - lo[active] <= 4 * np.spacing(hi[active])
+        active = active[~(matched | collapsed)]
+
+    # A bracket that collapsed onto vol_low or vol_high without matching means the quote's volatility
+    # lies outside vol_bounds
+    vols[valid & ~converged] = np.nan
+
+    return vols.reshape(shape)[()], converged.reshape(shape)[()], iterations.reshape(shape)[()]
@@ -0,0 +1,178 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Spans kept per trace; later spans are dropped (and counted) so a long-running process stays bounded
+MAX_SPANS = 100_000
+
+
+class Trace:
+    """Timing spans and counters collected while recording, exportable as JSON or a Chrome trace."""
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.max_spans = max_spans
+        self.origin = time.perf_counter_ns()
+        self.spans = []  # (name, start_ns, duration_ns, thread_id)
+        self.counters = {}
+        self.dropped_spans = 0
+        self._lock = threading.Lock()
+
+    def add_span(self, name, start, duration):
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append((name, start, duration, threading.get_ident()))
+            else:
+                self.dropped_spans += 1
+
+    def add_count(self, name, amount):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        # Per span name: number of calls and total / mean / max wall time in milliseconds, slowest first
+        totals = {}
+        for name, _, duration, _ in self.spans:
+            calls, total, longest = totals.get(name, (0, 0, 0))
+            totals[name] = (calls + 1, total + duration, max(longest, duration))
+        rows = [{'span': name, 'calls': calls, 'total_ms': total / 1e6, 'mean_ms': total / calls / 1e6,
+                 'max_ms': longest / 1e6} for name, (calls, total, longest) in totals.items()]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def to_json(self):
+        return {
+            'summary': self.summary(),
+            'counters': dict(self.counters),
+            'dropped_spans': self.dropped_spans,
+            'spans': [{'name': name, 'start_ms': (start - self.origin) / 1e6, 'duration_ms': duration / 1e6,
+                       'thread': thread} for name, start, duration, thread in self.spans],
+        }
+
+    def to_chrome_trace(self):
+        # Trace Event Format (chrome://tracing, Perfetto): complete events in microseconds, counters at the end
+        pid = os.getpid()
+        events = [{'name': name, 'cat': 'pricing', 'ph': 'X', 'ts': (start - self.origin) / 1e3,
+                   'dur': duration / 1e3, 'pid': pid, 'tid': thread}
+                  for name, start, duration, thread in self.spans]
+        end = max(((start + duration - self.origin) / 1e3 for _, start, duration, _ in self.spans), default=0.0)
+        events += [{'name': name, 'ph': 'C', 'ts': end, 'pid': pid, 'args': {name: value}}
+                   for name, value in self.counters.items()]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, path, format='json'):
+        data = self.to_chrome_trace() if format == 'chrome' else self.to_json()
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'start')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.trace.add_span(self.name, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_global_trace = None
+_local = threading.local()
+_active = 0  # traces currently recording; while 0, span() and count() return after one global check
+_active_lock = threading.Lock()
+
+
+def _current_trace():
+    return getattr(_local, 'trace', None) or _global_trace
+
+
+def span(name):
+    # Context manager timing the enclosed block; a shared no-op object when nothing is recording
+    if not _active:
+        return _NULL_SPAN
+    trace = _current_trace()
+    return _NULL_SPAN if trace is None else _Span(trace, name)
+
+
+def count(name, amount=1):
+    if _active:
+        trace = _current_trace()
+        if trace is not None:
+            trace.add_count(name, amount)
+
+
+def timed(name):
+    # Decorator form of span(); the check happens per call, so recording can be switched on at any time
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _change_active(delta):
+    global _active
+    with _active_lock:
+        _active += delta
+
+
+def enable(max_spans=MAX_SPANS):
+    # Record on every thread into one process-wide trace
+    global _global_trace
+    if _global_trace is None:
+        _global_trace = Trace(max_spans)
+        _change_active(1)
+    return _global_trace
+
+
+def disable():
+    # Stop process-wide recording and return what was collected
+    global _global_trace
+    trace, _global_trace = _global_trace, None
+    if trace is not None:
+        _change_active(-1)
+    return trace
+
+
+@contextmanager
+def recording(max_spans=MAX_SPANS):
+    # Record only what this thread runs inside the block, e.g. one Streamlit script run
+    trace = Trace(max_spans)
+    previous = getattr(_local, 'trace', None)
+    _local.trace = trace
+    _change_active(1)
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+        _change_active(-1)
+
+
+# BSM_PROFILE=1 records from import; BSM_PROFILE_TRACE=<path> also writes a Chrome trace on exit
+if os.environ.get('BSM_PROFILE') or os.environ.get('BSM_PROFILE_TRACE'):
+    enable()
+    if os.environ.get('BSM_PROFILE_TRACE'):
+        atexit.register(lambda: _global_trace and _global_trace.save(os.environ['BSM_PROFILE_TRACE'], 'chrome'))
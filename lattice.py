@@ -0,0 +1,124 @@
+import numpy as np
+
+from option_analysis import BlackScholesModel, _call_mask
+
+
+class LatticeOptionPricing:
+    """CRR binomial and Boyle trinomial trees for European or American options, batched over options.
+
+    S, K, T, r and v broadcast like BlackScholesModel inputs. Backward induction keeps only the current
+    layer of node values, a (nodes x options) array updated in place, so memory is O(steps) per option
+    and each step is one vectorized update across all nodes of a batch of options. Options are processed
+    in batches of batch_size so a layer stays cache-resident.
+    """
+
+    def __init__(self, S, K, T, r, v, option_type='put', steps=500, american=True, method='binomial', smoothing=False,
+                 batch_size=64):
+        S, K, T, r, v = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, v)))
+        self.shape = S.shape
+        self.S, self.K, self.T, self.r, self.v = (np.ravel(x) for x in (S, K, T, r, v))
+        self.sign = np.where(np.ravel(np.broadcast_to(_call_mask(option_type), self.shape)), 1.0, -1.0)
+        self.steps = steps
+        self.american = american
+        self.method = method
+        self.smoothing = smoothing  # Black-Scholes values on the last step (BBS), which removes the odd/even oscillation
+        self.batch_size = batch_size
+
+    def _last_step_values(self, spots, dt, K, r, v, sign):
+        # Closed-form European values one step before expiry, floored at exercise value for American options
+        values = np.array(BlackScholesModel(spots, K, dt, r, v, sign > 0).option_price())
+        if self.american:
+            np.maximum(values, sign * (spots - K), out=values)
+        return values
+
+    def _binomial(self, steps, smoothing, S, K, T, r, v, sign):
+        dt = T / steps
+        u = np.exp(v * np.sqrt(dt))
+        discount = np.exp(-r * dt)
+        p_up = (np.exp(r * dt) - 1 / u) / (u - 1 / u)
+        weight_up, weight_down = discount * p_up, discount * (1 - p_up)
+
+        # Terminal layer: S * u^(2j - steps), j = 0..steps
+        spots = S * u ** (2 * np.arange(steps + 1)[:, np.newaxis] - steps)
+        values = np.maximum(sign * (spots - K), 0.0)
+        scratch = np.empty_like(values)
+        layers = steps
+        if smoothing:
+            spots = spots[:-1] * u
+            values = self._last_step_values(spots, dt, K, r, v, sign)
+            layers -= 1
+        for _ in range(layers):
+            n = len(values) - 1
+            np.multiply(values[1:], weight_up, out=scratch[:n])
+            values = values[:n]
+            values *= weight_down
+            values += scratch[:n]
+            if self.american:
+                # With u * d = 1, the spots one layer back are the current ones times u, minus the top node
+                spots = spots[:n]
+                spots *= u
+                np.subtract(spots, K, out=scratch[:n])
+                scratch[:n] *= sign
+                np.maximum(values, scratch[:n], out=values)
+        return values[0]
+
+    def _trinomial(self, steps, smoothing, S, K, T, r, v, sign):
+        dt = T / steps
+        u = np.exp(v * np.sqrt(2 * dt))
+        half_up = np.exp(v * np.sqrt(dt / 2))
+        growth = np.exp(r * dt / 2)
+        p_up = ((growth - 1 / half_up) / (half_up - 1 / half_up))**2
+        p_down = ((half_up - growth) / (half_up - 1 / half_up))**2
+        discount = np.exp(-r * dt)
+        weight_up, weight_mid, weight_down = discount * p_up, discount * (1 - p_up - p_down), discount * p_down
+
+        # Terminal layer: S * u^(j - steps), j = 0..2 * steps
+        spots = S * u ** (np.arange(2 * steps + 1)[:, np.newaxis] - steps)
+        values = np.maximum(sign * (spots - K), 0.0)
+        scratch, scratch_up = np.empty_like(values), np.empty_like(values)
+        layers = steps
+        if smoothing:
+            spots = spots[1:-1]
+            values = self._last_step_values(spots, dt, K, r, v, sign)
+            layers -= 1
+        for _ in range(layers):
+            n = len(values) - 2
+            np.multiply(values[1:-1], weight_mid, out=scratch[:n])
+            np.multiply(values[2:], weight_up, out=scratch_up[:n])
+            scratch[:n] += scratch_up[:n]
+            values = values[:n]
+            values *= weight_down
+            values += scratch[:n]
+            if self.american:
+                # The spots one layer back are the current ones without the two outer nodes
+                spots = spots[1:-1]
+                np.subtract(spots, K, out=scratch[:n])
+                scratch[:n] *= sign
+                np.maximum(values, scratch[:n], out=values)
+        return values[0]
+
+    def option_price(self, steps=None, smoothing=None):
+        steps = self.steps if steps is None else steps
+        smoothing = self.smoothing if smoothing is None else smoothing
+        tree = self._binomial if self.method == 'binomial' else self._trinomial
+
+        price = np.empty(self.S.shape)
+        for start in range(0, len(price), self.batch_size):
+            batch = slice(start, start + self.batch_size)
+            price[batch] = tree(steps, smoothing, self.S[batch], self.K[batch], self.T[batch], self.r[batch],
+                                self.v[batch], self.sign[batch])
+        return price.reshape(self.shape)[()]
+
+    def richardson_price(self, tol=1e-4, start_steps=50, max_steps=6400):
+        # Two-point Richardson extrapolation 2 * V(2N) - V(N), doubling N until successive
+        # extrapolated prices of every option agree to within tol (or max_steps is reached).
+        # Always runs on smoothed trees: the raw CRR error oscillates and does not extrapolate reliably.
+        steps = start_steps
+        coarse = self.option_price(steps, smoothing=True)
+        previous = None
+        while True:
+            fine = self.option_price(2 * steps, smoothing=True)
+            extrapolated = 2 * fine - coarse
+            if previous is not None and (np.all(np.abs(extrapolated - previous) < tol) or 4 * steps > max_steps):
+                return extrapolated, 2 * steps
+            previous, coarse, steps = extrapolated, fine, 2 * steps
@@ -1,9 +1,34 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-import streamlit as st 
 
-@st.cache_resource
+from instrumentation import count, timed
+from numerics import norm_ppf
+from option_analysis import BlackScholesModel
+
+
+def _chunk_payoffs(S, K, T, r, v, option_type, num_paths, seed_sequence):
+    # Antithetic-pair payoffs for one chunk, drawn from the chunk's own Generator
+    rng = np.random.default_rng(seed_sequence)
+    z = rng.standard_normal(num_paths)
+    drift = (r - 0.5 * v**2) * T
+    diffusion = v * np.sqrt(T) * z
+    ST = S * np.exp(drift + diffusion)
+    ST_antithetic = S * np.exp(drift - diffusion)
+
+    if option_type == 'call':
+        return (np.maximum(ST - K, 0) + np.maximum(ST_antithetic - K, 0)) / 2
+    return (np.maximum(K - ST, 0) + np.maximum(K - ST_antithetic, 0)) / 2
+
+
+def _simulate_chunk(S, K, T, r, v, option_type, num_paths, seed_sequence):
+    return _chunk_payoffs(S, K, T, r, v, option_type, num_paths, seed_sequence).sum()
+
+
 class MonteCarloOptionPricing:
-    def __init__(self, S, K, T, r, v, option_type='put', num_simulations=10000):
+    def __init__(self, S, K, T, r, v, option_type='put', num_simulations=10000, num_steps=252, seed=42):
         self.S = S          # Spot Price
         self.K = K          # Strike Price
         self.T = T          # Time to Expiry (in years)
@@ -11,14 +36,18 @@ class MonteCarloOptionPricing:
         self.v = v          # Volatility
         self.option_type = option_type.lower()
         self.num_simulations = num_simulations
+        self.num_steps = num_steps      # Time steps per simulated path
+        self.seed = seed
 
+    @timed('monte_carlo.simulate')
     def simulate(self):
-        # Generate random price paths
-        np.random.seed(42)  # For reproducibility
+        # Generate random price paths from a local Generator (the global np.random state is not thread-safe)
+        rng = np.random.default_rng(self.seed)
         
         # Generate standard normal random variables for two sets (regular and antithetic)
-        z = np.random.normal(0, 1, self.num_simulations)
+        z = rng.standard_normal(self.num_simulations)
         z_antithetic = -z  # Antithetic variates
+        count('paths_simulated', 2 * self.num_simulations)
 
         # Simulated final stock prices
         ST = self.S * np.exp((self.r - 0.5 * self.v**2) * self.T + self.v * np.sqrt(self.T) * z)
@@ -37,14 +66,266 @@ class MonteCarloOptionPricing:
 
         return option_price, ST, ST_antithetic  # Return the option price and both sets of final stock prices
 
-    def generate_paths(self):
-        # Generate multiple price paths
-        price_paths = np.zeros((self.num_simulations, 2))  # Store initial and final prices
-        price_paths[:, 0] = self.S
-        
-        for i in range(self.num_simulations):
-            z = np.random.normal(0, 1)  # One random sample for each path
+    @timed('monte_carlo.simulate_parallel')
+    def simulate_parallel(self, num_workers=None, chunk_size=1_000_000):
+        # Split the simulation into fixed-size chunks, each seeded by its own child of one SeedSequence.
+        # Chunks (not workers) own the random streams and are summed in chunk order, so the price is
+        # bit-identical for a given seed and chunk_size however many workers run.
+        num_workers = num_workers or os.cpu_count()
+        num_chunks = -(-self.num_simulations // chunk_size)
+        chunk_paths = [chunk_size] * (num_chunks - 1) + [self.num_simulations - chunk_size * (num_chunks - 1)]
+        seed_sequences = np.random.SeedSequence(self.seed).spawn(num_chunks)
+        count('paths_simulated', 2 * self.num_simulations)  # antithetic pairs, as in simulate()
+        args = [(self.S, self.K, self.T, self.r, self.v, self.option_type, n, seq)
+                for n, seq in zip(chunk_paths, seed_sequences)]
+
+        if num_workers == 1:
+            chunk_sums = [_simulate_chunk(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                chunk_sums = list(executor.map(_simulate_chunk, *zip(*args)))
+
+        return np.exp(-self.r * self.T) * sum(chunk_sums) / self.num_simulations
+
+    @timed('monte_carlo.simulate_streaming')
+    def simulate_streaming(self, chunk_size=100_000, target_std_error=None, time_budget=None, confidence=0.95,
+                           max_paths=None):
+        # Price from fixed-size chunks with a running mean/variance, so memory is set by chunk_size rather
+        # than path count. Stops at max_paths (default num_simulations), or earlier once the standard error
+        # falls to target_std_error or time_budget seconds have elapsed.
+        max_paths = self.num_simulations if max_paths is None else max_paths
+        discount = np.exp(-self.r * self.T)
+        root_sequence = np.random.SeedSequence(self.seed)
+        start = time.perf_counter()
+
+        num_paths, mean, m2 = 0, 0.0, 0.0
+        std_error = np.inf
+        while num_paths < max_paths:
+            n = min(chunk_size, max_paths - num_paths)
+            samples = discount * _chunk_payoffs(self.S, self.K, self.T, self.r, self.v, self.option_type, n,
+                                                root_sequence.spawn(1)[0])
+            count('paths_simulated', 2 * n)
+
+            # Chan et al. pairwise update of the running mean and sum of squared deviations
+            chunk_mean = samples.mean()
+            chunk_m2 = np.sum((samples - chunk_mean)**2)
+            delta = chunk_mean - mean
+            total = num_paths + n
+            mean += delta * n / total
+            m2 += chunk_m2 + delta**2 * num_paths * n / total
+            num_paths = total
+
+            if num_paths > 1:
+                std_error = np.sqrt(m2 / (num_paths - 1) / num_paths)
+            if target_std_error is not None and std_error <= target_std_error:
+                break
+            if time_budget is not None and time.perf_counter() - start >= time_budget:
+                break
+
+        half_width = norm_ppf(0.5 + confidence / 2) * std_error
+        return mean, std_error, (mean - half_width, mean + half_width), num_paths
+
+    @timed('monte_carlo.simulate_sobol')
+    def simulate_sobol(self, num_randomizations=16, confidence=0.95):
+        from scipy.stats import qmc, t
+
+        # Randomized QMC: independent Owen-scrambled Sobol sequences, each of a power-of-two size, give
+        # i.i.d. replicate estimates whose spread is the error estimate
+        points = max(2, 2 ** int(np.log2(max(self.num_simulations // num_randomizations, 1))))
+        seeds = np.random.SeedSequence(self.seed).spawn(num_randomizations)
+        discount = np.exp(-self.r * self.T)
+        count('paths_simulated', points * num_randomizations)
+
+        estimates = np.empty(num_randomizations)
+        for i, seed in enumerate(seeds):
+            u = qmc.Sobol(d=1, scramble=True, seed=np.random.default_rng(seed)).random(points)[:, 0]
+            z = norm_ppf(u)
             ST = self.S * np.exp((self.r - 0.5 * self.v**2) * self.T + self.v * np.sqrt(self.T) * z)
-            price_paths[i, 1] = ST
+            payoffs = np.maximum(ST - self.K, 0) if self.option_type == 'call' else np.maximum(self.K - ST, 0)
+            estimates[i] = discount * payoffs.mean()
+
+        price = estimates.mean()
+        std_error = estimates.std(ddof=1) / np.sqrt(num_randomizations)
+        half_width = t.ppf(0.5 + confidence / 2, num_randomizations - 1) * std_error
+        return price, std_error, (price - half_width, price + half_width), points * num_randomizations
+
+    @timed('monte_carlo.simulate_control_variate')
+    def simulate_control_variate(self, payoff='european', control='spot', price_paths=None, confidence=0.95,
+                                 **payoff_kwargs):
+        # Control-variate estimator with the optimal coefficient estimated from the sample. The control is
+        # either control='spot', the discounted terminal spot (mean S), or control='black_scholes', the
+        # vanilla European payoff (mean given by the closed-form BlackScholesModel price), the latter being
+        # the natural control for exotic payoffs.
+        if control not in ('spot', 'black_scholes'):
+            raise ValueError(f"unknown control {control!r}; use 'spot' or 'black_scholes'")
+        if price_paths is None:
+            if payoff == 'european':
+                # Terminal prices are all a European payoff needs
+                rng = np.random.default_rng(self.seed)
+                z = rng.standard_normal(self.num_simulations)
+                count('paths_simulated', self.num_simulations)
+                ST = self.S * np.exp((self.r - 0.5 * self.v**2) * self.T + self.v * np.sqrt(self.T) * z)
+                price_paths = np.column_stack([np.full(self.num_simulations, self.S), ST])
+            else:
+                price_paths = self.generate_paths()
+
+        discount = np.exp(-self.r * self.T)
+        samples = discount * PATH_PAYOFFS[payoff](price_paths, self.K, self.option_type, **payoff_kwargs)
+        if control == 'spot':
+            controls = discount * price_paths[:, -1]
+            control_mean = self.S
+        else:  # 'black_scholes'
+            controls = discount * european_payoff(price_paths, self.K, self.option_type)
+            control_mean = BlackScholesModel(self.S, self.K, self.T, self.r, self.v, self.option_type).option_price()
+
+        covariance = np.cov(samples, controls)
+        beta = covariance[0, 1] / covariance[1, 1] if covariance[1, 1] > 0 else 0.0
+        adjusted = samples - beta * (controls - control_mean)
+
+        price = adjusted.mean()
+        std_error = adjusted.std(ddof=1) / np.sqrt(len(adjusted))
+        variance_reduction = covariance[0, 0] / adjusted.var(ddof=1) if adjusted.var(ddof=1) > 0 else np.inf
+        half_width = norm_ppf(0.5 + confidence / 2) * std_error
+        return price, std_error, (price - half_width, price + half_width), variance_reduction
+
+    @timed('monte_carlo.generate_paths')
+    def generate_paths(self, num_paths=None, columns=None, chunk_size=10_000):
+        # Simulate a (num_paths x num_steps + 1) GBM matrix in one pass from cumulative log-returns.
+        # With columns, only those time steps are kept and paths are built chunk_size at a time, so memory
+        # stays O(num_paths x len(columns)); the draws (and values) are the same as for the full matrix.
+        num_paths = self.num_simulations if num_paths is None else num_paths
+        count('paths_simulated', num_paths)
+        rng = np.random.default_rng(self.seed)
+        if columns is None:
+            z = rng.standard_normal((num_paths, self.num_steps))
+            return self._paths_from_normals(z, self.S, self.T, self.r, self.v)
 
+        price_paths = np.empty((num_paths, len(columns)))
+        for start in range(0, num_paths, chunk_size):
+            z = rng.standard_normal((min(chunk_size, num_paths - start), self.num_steps))
+            price_paths[start:start + len(z)] = self._paths_from_normals(z, self.S, self.T, self.r, self.v)[:, columns]
         return price_paths
+
+    def _paths_from_normals(self, z, S, T, r, v):
+        # Map a fixed (num_paths x num_steps) normal matrix to GBM paths, so bumped parameters can reuse it
+        num_paths, num_steps = z.shape
+        dt = T / num_steps
+        log_returns = (r - 0.5 * v**2) * dt + v * np.sqrt(dt) * z
+
+        price_paths = np.empty((num_paths, num_steps + 1))
+        price_paths[:, 0] = S
+        np.cumsum(log_returns, axis=1, out=price_paths[:, 1:])
+        np.exp(price_paths[:, 1:], out=price_paths[:, 1:])
+        price_paths[:, 1:] *= S
+
+        return price_paths
+
+    def greeks(self, method='pathwise', payoff='european', bump=1e-2, **payoff_kwargs):
+        # Delta, gamma, theta, vega and rho (same order and conventions as BlackScholesModel.greeks) from
+        # one set of draws. 'pathwise' and 'likelihood_ratio' differentiate the European payoff on the
+        # terminal draws; 'bump' revalues any payoff with central differences on common random numbers.
+        rng = np.random.default_rng(self.seed)
+        if method == 'bump':
+            z = rng.standard_normal((self.num_simulations, self.num_steps))
+            return self._bumped_greeks(z, payoff, bump, **payoff_kwargs)
+        if method not in ('pathwise', 'likelihood_ratio'):
+            raise ValueError(f"unknown Greeks method {method!r}")
+        if payoff != 'european' or payoff_kwargs:
+            raise ValueError(f"method {method!r} only supports the European payoff; use method='bump' for {payoff!r}")
+
+        S, K, T, r, v = self.S, self.K, self.T, self.r, self.v
+        z = rng.standard_normal(self.num_simulations)
+        sqrt_T = np.sqrt(T)
+        discount = np.exp(-r * T)
+        ST = S * np.exp((r - 0.5 * v**2) * T + v * sqrt_T * z)
+        sign = 1.0 if self.option_type == 'call' else -1.0
+        payoff_values = np.maximum(sign * (ST - K), 0)
+
+        if method == 'pathwise':
+            # d(payoff)/d(ST) is sign * 1{in the money}; gamma uses the mixed pathwise / likelihood-ratio form
+            in_the_money = sign * (payoff_values > 0)
+            delta = discount * in_the_money * ST / S
+            gamma = discount * in_the_money * ST / S**2 * (z / (v * sqrt_T) - 1)
+            vega = discount * in_the_money * ST * (sqrt_T * z - v * T)
+            rho = discount * T * (in_the_money * ST - payoff_values)
+            theta = r * discount * payoff_values - \
+                discount * in_the_money * ST * (r - 0.5 * v**2 + v * z / (2 * sqrt_T))
+        else:
+            # Likelihood ratio: discounted payoff times the score of the lognormal terminal density
+            weighted = discount * payoff_values
+            delta = weighted * z / (S * v * sqrt_T)
+            gamma = weighted * (z**2 - 1 - z * v * sqrt_T) / (S**2 * v**2 * T)
+            vega = weighted * ((z**2 - 1) / v - z * sqrt_T)
+            rho = weighted * (z * sqrt_T / v - T)
+            theta = r * weighted - weighted * (z * (r - 0.5 * v**2) / (v * sqrt_T) + (z**2 - 1) / (2 * T))
+
+        return tuple(np.mean(g) for g in (delta, gamma, theta, vega, rho))
+
+    def _bumped_greeks(self, z, payoff, bump, **payoff_kwargs):
+        # Central differences with the same normals for every revaluation (common random numbers)
+        payoff_function = PATH_PAYOFFS[payoff]
+
+        def value(S=self.S, T=self.T, r=self.r, v=self.v):
+            price_paths = self._paths_from_normals(z, S, T, r, v)
+            return np.exp(-r * T) * np.mean(payoff_function(price_paths, self.K, self.option_type, **payoff_kwargs))
+
+        dS = bump * self.S
+        dv = bump * self.v
+        dr = bump * max(abs(self.r), 1e-2)
+        dT = min(bump * self.T, self.T / 2)
+        base = value()
+        up, down = value(S=self.S + dS), value(S=self.S - dS)
+
+        delta = (up - down) / (2 * dS)
+        gamma = (up - 2 * base + down) / dS**2
+        theta = (value(T=self.T - dT) - base) / dT
+        vega = (value(v=self.v + dv) - value(v=self.v - dv)) / (2 * dv)
+        rho = (value(r=self.r + dr) - value(r=self.r - dr)) / (2 * dr)
+        return delta, gamma, theta, vega, rho
+
+    def time_grid(self):
+        return np.linspace(0.0, self.T, self.num_steps + 1)
+
+    def price_path_dependent(self, payoff='asian', price_paths=None, **payoff_kwargs):
+        # Price a path-dependent payoff ('european', 'asian', 'barrier' or 'lookback') on simulated paths
+        if price_paths is None:
+            price_paths = self.generate_paths()
+        payoffs = PATH_PAYOFFS[payoff](price_paths, self.K, self.option_type, **payoff_kwargs)
+        return np.exp(-self.r * self.T) * np.mean(payoffs)
+
+
+def european_payoff(price_paths, K, option_type):
+    ST = price_paths[:, -1]
+    return np.maximum(ST - K, 0) if option_type == 'call' else np.maximum(K - ST, 0)
+
+
+def asian_payoff(price_paths, K, option_type):
+    # Arithmetic average over the monitoring dates after inception
+    average = price_paths[:, 1:].mean(axis=1)
+    return np.maximum(average - K, 0) if option_type == 'call' else np.maximum(K - average, 0)
+
+
+def barrier_payoff(price_paths, K, option_type, barrier, barrier_type='up-and-out'):
+    # barrier_type is one of 'up-and-out', 'up-and-in', 'down-and-out', 'down-and-in'
+    direction, knock = barrier_type.split('-and-')
+    if direction == 'up':
+        crossed = price_paths.max(axis=1) >= barrier
+    else:
+        crossed = price_paths.min(axis=1) <= barrier
+    alive = ~crossed if knock == 'out' else crossed
+    return np.where(alive, european_payoff(price_paths, K, option_type), 0.0)
+
+
+def lookback_payoff(price_paths, K, option_type):
+    # Fixed-strike lookback: the call pays on the path maximum, the put on the path minimum
+    if option_type == 'call':
+        return np.maximum(price_paths.max(axis=1) - K, 0)
+    return np.maximum(K - price_paths.min(axis=1), 0)
+
+
+PATH_PAYOFFS = {
+    'european': european_payoff,
+    'asian': asian_payoff,
+    'barrier': barrier_payoff,
+    'lookback': lookback_payoff,
+}
@@ -0,0 +1,76 @@
+import importlib.util
+import math
+import os
+
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+def _numpy_cdf(x):
+    return ndtr(x)
+
+
+def _numpy_pdf(x):
+    return INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def _build_numba_kernels():
+    # Imported and compiled lazily, on first selection, so importing this module never pays the JIT cost
+    import numba
+
+    @numba.vectorize(['float64(float64)'], cache=True)
+    def cdf(x):
+        return 0.5 * math.erfc(-x / math.sqrt(2.0))
+
+    @numba.vectorize(['float64(float64)'], cache=True)
+    def pdf(x):
+        return INV_SQRT_2PI * math.exp(-0.5 * x * x)
+
+    return cdf, pdf
+
+
+def _scipy_kernels():
+    import scipy.stats as si
+    return si.norm.cdf, si.norm.pdf
+
+
+# Backend name -> (cdf, pdf) factory. 'scipy' is the frozen-distribution path kept for comparison.
+BACKENDS = {
+    'numpy': lambda: (_numpy_cdf, _numpy_pdf),
+    'scipy': _scipy_kernels,
+}
+if importlib.util.find_spec('numba') is not None:  # the JIT backend is optional
+    BACKENDS['numba'] = _build_numba_kernels
+
+_active = {}
+
+
+def set_backend(name):
+    """Select the normal-distribution kernels used by the pricing code ('numpy', 'numba' or 'scipy')."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown numerics backend '{name}'; available: {', '.join(BACKENDS)}")
+    cdf, pdf = BACKENDS[name]()
+    _active.update(name=name, cdf=cdf, pdf=pdf)
+
+
+def get_backend():
+    return _active['name']
+
+
+def norm_cdf(x):
+    return _active['cdf'](x)
+
+
+def norm_pdf(x):
+    return _active['pdf'](x)
+
+
+def norm_ppf(p):
+    return ndtri(p)
+
+
+# BSM_NUMERICS_BACKEND picks the default; asking for 'numba' without numba installed falls back to NumPy
+_requested = os.environ.get('BSM_NUMERICS_BACKEND', 'numpy')
+set_backend(_requested if _requested in BACKENDS else 'numpy')
@@ -1,44 +1,98 @@
 import numpy as np
-import scipy.stats as si
-import numpy as np
-import plotly.graph_objects as go
+
+from instrumentation import count, timed
+from numerics import norm_cdf, norm_pdf
+
+
+def _call_mask(option_type):
+    # Accept a single 'call'/'put' string, an array of such strings, or a boolean mask (True = call)
+    if isinstance(option_type, str):
+        return option_type.lower() == 'call'
+    option_type = np.asarray(option_type)
+    if option_type.dtype == bool:
+        return option_type
+    return np.char.lower(option_type.astype(str)) == 'call'
 
 
 class BlackScholesModel:
+    """Black-Scholes pricer for a single option or a broadcastable batch of options.
+
+    S, K, T, r and v may be scalars or NumPy arrays; option_type may be 'call'/'put',
+    an array of those strings, or a boolean call mask. The terms shared by the price and
+    the Greeks (d1/d2, discount factor, pdf/cdf values) are computed once on construction.
+    """
+
+    @timed('black_scholes.setup')
     def __init__(self, S, K, T, r, v, option_type='put'):
-        self.S = S
-        self.K = K
-        self.T = T
-        self.r = r
-        self.v = v
-        self.option_type = option_type.lower()
+        self.S = np.asarray(S, dtype=float)
+        self.K = np.asarray(K, dtype=float)
+        self.T = np.asarray(T, dtype=float)
+        self.r = np.asarray(r, dtype=float)
+        self.v = np.asarray(v, dtype=float)
+        self.option_type = option_type.lower() if isinstance(option_type, str) else option_type
+        self.is_call = _call_mask(option_type)
+
+        self.sqrt_T = np.sqrt(self.T)
+        self.vol_sqrt_T = self.v * self.sqrt_T
+        self.discount = np.exp(-self.r * self.T)
         self.d1, self.d2 = self._calculate_d1_d2()
 
+        # +1 for calls, -1 for puts: N(sign * d) covers both N(d) and N(-d) with one cdf call
+        self.sign = np.where(self.is_call, 1.0, -1.0)
+        self.cdf_d1 = norm_cdf(self.sign * self.d1)
+        self.cdf_d2 = norm_cdf(self.sign * self.d2)
+        self.pdf_d1 = norm_pdf(self.d1)
+        count('options_priced', self.d1.size)
+
     def _calculate_d1_d2(self):
-        d1 = (np.log(self.S/self.K) + (self.r + 0.5 * self.v**2) * self.T) / (self.v * np.sqrt(self.T))
-        d2 = d1 - self.v * np.sqrt(self.T)
+        d1 = (np.log(self.S/self.K) + (self.r + 0.5 * self.v**2) * self.T) / self.vol_sqrt_T
+        d2 = d1 - self.vol_sqrt_T
         return d1, d2
 
+    @timed('black_scholes.option_price')
     def option_price(self):
-        if self.option_type == 'call':
-            price = self.S * si.norm.cdf(self.d1) - self.K * np.exp(-self.r * self.T) * si.norm.cdf(self.d2)
-        else:
-            price = self.K * np.exp(-self.r * self.T) * si.norm.cdf(-self.d2) - self.S * si.norm.cdf(-self.d1)
-        return price
+        price = self.sign * (self.S * self.cdf_d1 - self.K * self.discount * self.cdf_d2)
+        return price[()]
 
+    @timed('black_scholes.greeks')
     def greeks(self):
-        delta = si.norm.cdf(self.d1) if self.option_type == 'call' else si.norm.cdf(self.d1) - 1
-        gamma = si.norm.pdf(self.d1) / (self.S * self.v * np.sqrt(self.T))
-        theta = -(self.S * si.norm.pdf(self.d1) * self.v) / (2 * np.sqrt(self.T)) - \
-                self.r * self.K * np.exp(-self.r * self.T) * si.norm.cdf(self.d2)
-        vega = self.S * si.norm.pdf(self.d1) * np.sqrt(self.T)
-        rho = self.K * self.T * np.exp(-self.r * self.T) * si.norm.cdf(self.d2) if self.option_type == 'call' \
-            else -self.K * self.T * np.exp(-self.r * self.T) * si.norm.cdf(-self.d2)
-        return delta, gamma, theta, vega, rho
+        delta = self.sign * self.cdf_d1
+        gamma = self.pdf_d1 / (self.S * self.vol_sqrt_T)
+        theta = -(self.S * self.pdf_d1 * self.v) / (2 * self.sqrt_T) - \
+                self.sign * self.r * self.K * self.discount * self.cdf_d2
+        vega = self.S * self.pdf_d1 * self.sqrt_T
+        rho = self.sign * self.K * self.T * self.discount * self.cdf_d2
+        return delta[()], gamma[()], theta[()], vega[()], rho[()]
+
+    def price_and_greeks(self):
+        return self.option_price(), self.greeks()
+
+    @timed('black_scholes.higher_order_greeks')
+    def higher_order_greeks(self):
+        # Vanna, volga, charm, speed, zomma and color from the kernel generated off the symbolic model
+        from higher_order_greeks import higher_order_greeks
+
+        return higher_order_greeks(self.S, self.K, self.T, self.r, self.v)
+
+
+# Largest spot grid spot_curve_price_and_greeks will solve on; each call runs five solves (base + vega/rho bumps)
+MAX_PDE_NODES = 2_000
+
+
+def spot_curve_price_and_greeks(spots, K, T, r, v, option_type, american=False):
+    # Price and Greeks over a whole spot axis from one Crank-Nicolson solve, with a grid that covers the axis
+    from finite_difference import FiniteDifferenceOptionPricing
+
+    spots = np.asarray(spots, dtype=float)
+    s_max = max(4 * K, 1.25 * spots.max())
+    # About 100 nodes per strike, capped so a small strike over a wide spot axis cannot blow up the grid
+    num_space = int(np.clip(np.ceil(s_max / (K / 100)), 400, MAX_PDE_NODES))
+    solver = FiniteDifferenceOptionPricing(K, T, r, v, option_type, american=american, num_space=num_space, s_max=s_max)
+    return solver.price_and_greeks(spots)
 
 
 class OptionPlotter:
-    def __init__(self, S, K, T, r, v, option_type, x_variable, x_values):
+    def __init__(self, S, K, T, r, v, option_type, x_variable, x_values, backend='black_scholes', american=False):
         self.S = S
         self.K = K
         self.T = T
@@ -47,8 +101,14 @@ class OptionPlotter:
         self.option_type = option_type.lower()
         self.x_variable = x_variable
         self.x_values = x_values
+        # 'finite_difference' prices a spot x-axis with one PDE solve (and supports American exercise)
+        self.backend = backend
+        self.american = american
 
     def calculate_option_price_and_greeks(self, x_val):
+        if self.backend == 'finite_difference' and self.x_variable == 'S':
+            return spot_curve_price_and_greeks(np.atleast_1d(x_val), self.K, self.T, self.r, self.v,
+                                               self.option_type, self.american)
         params = {
             'S': self.S, 'K': self.K, 'T': self.T, 'r': self.r, 'v': self.v
         }
@@ -59,21 +119,18 @@ class OptionPlotter:
         return price, greeks
 
     def generate_values(self):
-        prices, delta_vals, gamma_vals, theta_vals, vega_vals, rho_vals = [], [], [], [], [], []
-        
-        for x_val in self.x_values:
-            price, (delta, gamma, theta, vega, rho) = self.calculate_option_price_and_greeks(x_val)
-            prices.append(price)
-            delta_vals.append(delta)
-            gamma_vals.append(gamma)
-            theta_vals.append(theta)
-            vega_vals.append(vega)
-            rho_vals.append(rho)
-
-        greeks_vals = {'delta': delta_vals, 'gamma': gamma_vals, 'theta': theta_vals, 'vega': vega_vals, 'rho': rho_vals}
+        # One batched model over the whole x-axis instead of one model per point
+        price, (delta, gamma, theta, vega, rho) = self.calculate_option_price_and_greeks(np.asarray(self.x_values))
+        prices = np.broadcast_to(price, np.shape(self.x_values))
+
+        greeks_vals = {'delta': delta, 'gamma': gamma, 'theta': theta, 'vega': vega, 'rho': rho}
+        greeks_vals = {greek: np.broadcast_to(vals, prices.shape) for greek, vals in greeks_vals.items()}
         return prices, greeks_vals
 
+    @timed('figure.option_plot')
     def plot(self, prices, greeks_vals, show_greeks):
+        import plotly.graph_objects as go  # plotting only; keeps pricing imports light
+
         fig = go.Figure()
 
         # Plot Option Value
@@ -99,108 +156,84 @@ class OptionPlotter:
         return fig
 
 
+SENSITIVITY_PARAMS = {
+    'Spot Price': 'S',
+    'Strike Price': 'K',
+    'Volatility': 'v',
+    'Expiry Time': 'T',
+    'Interest Rate': 'r'
+}
 
-class OptionPlotter:
-    def __init__(self, S, K, T, r, v, option_type, x_variable, x_values):
-        self.S = S
-        self.K = K
-        self.T = T
-        self.r = r
-        self.v = v
-        self.option_type = option_type.lower()
-        self.x_variable = x_variable
-        self.x_values = x_values
-
-    def calculate_option_price_and_greeks(self, x_val):
-        params = {
-            'S': self.S, 'K': self.K, 'T': self.T, 'r': self.r, 'v': self.v
-        }
-        params[self.x_variable] = x_val
-        model = BlackScholesModel(**params, option_type=self.option_type)
-        price = model.option_price()
-        greeks = model.greeks()
-        return price, greeks
 
-    def generate_values(self):
-        prices, delta_vals, gamma_vals, theta_vals, vega_vals, rho_vals = [], [], [], [], [], []
-        
-        for x_val in self.x_values:
-            price, (delta, gamma, theta, vega, rho) = self.calculate_option_price_and_greeks(x_val)
-            prices.append(price)
-            delta_vals.append(delta)
-            gamma_vals.append(gamma)
-            theta_vals.append(theta)
-            vega_vals.append(vega)
-            rho_vals.append(rho)
-
-        greeks_vals = {'delta': delta_vals, 'gamma': gamma_vals, 'theta': theta_vals, 'vega': vega_vals, 'rho': rho_vals}
-        return prices, greeks_vals
+# Default sweep range (from, to) for each sensitivity variable
+SENSITIVITY_RANGES = {
+    'Spot Price': (0.01, 1000.0),
+    'Strike Price': (0.01, 1000.0),
+    'Volatility': (0.01, 1.0),
+    'Expiry Time': (0.01, 5.0),
+    'Interest Rate': (0.0, 1.0)
+}
 
-    def plot(self, prices, greeks_vals, show_greeks):
-        fig = go.Figure()
+GREEK_NAMES = ['delta', 'gamma', 'theta', 'vega', 'rho']
 
-        # Plot Option Value
-        fig.add_trace(go.Scatter(
-            x=self.x_values, y=prices, mode='lines', name='Option Value', line=dict(color='red')
-        ))
 
-        # Plot selected Greeks
-        for greek, show in show_greeks.items():
-            if show:
-                fig.add_trace(go.Scatter(
-                    x=self.x_values, y=greeks_vals[greek], mode='lines', name=greek.capitalize()
-                ))
+def sensitivity_axis(sensitivity_variable, num_points=100, value_range=None):
+    value_from, value_to = value_range or SENSITIVITY_RANGES[sensitivity_variable]
+    return np.linspace(value_from, value_to, num_points)
 
-        fig.update_layout(
-            title=f'{self.option_type.capitalize()} Option Value and Greeks vs {self.x_variable}',
-            xaxis_title=self.x_variable,
-            yaxis_title='Option Value / Greeks',
-            hovermode="x",
-            template='plotly_white'
-        )
 
-        return fig
+@timed('sensitivity.sweep')
+def run_sensitivity_analysis(S, K, T, r, v, option_type, sensitivity_variable, sensitivity_values=None,
+                             backend='black_scholes', american=False):
+    # Generate sensitivity values based on the selected variable unless an axis is supplied
+    if sensitivity_values is None:
+        sensitivity_values = sensitivity_axis(sensitivity_variable)
 
-def run_sensitivity_analysis(S, K, T, r, v, option_type, sensitivity_variable):
-    num_points = 100  # Number of points to generate
-    sensitivity_values = None
-    
-    # Generate sensitivity values based on the selected variable
-    if sensitivity_variable == 'Spot Price':
-        sensitivity_values = np.linspace(0.01, 1000.0, num_points)
-    elif sensitivity_variable == 'Strike Price':
-        sensitivity_values = np.linspace(0.01, 1000.0, num_points)
-    elif sensitivity_variable == 'Volatility':
-        sensitivity_values = np.linspace(0.01, 1.0, num_points)
-    elif sensitivity_variable == 'Expiry Time':
-        sensitivity_values = np.linspace(0.01, 5.0, num_points)
-    else:  # Interest Rate
-        sensitivity_values = np.linspace(0.0, 1.0, num_points)
-
-    # Calculate option prices and Greeks for sensitivity analysis
-    sensitivity_prices = []
-    sensitivity_greeks = {greek: [] for greek in ['delta', 'gamma', 'theta', 'vega', 'rho']}
-
-    for value in sensitivity_values:
-        if sensitivity_variable == 'Spot Price':
-            model = BlackScholesModel(value, K, T, r, v, option_type)
-        elif sensitivity_variable == 'Strike Price':
-            model = BlackScholesModel(S, value, T, r, v, option_type)
-        elif sensitivity_variable == 'Volatility':
-            model = BlackScholesModel(S, K, T, r, value, option_type)
-        elif sensitivity_variable == 'Expiry Time':
-            model = BlackScholesModel(S, K, value, r, v, option_type)
-        else:  # Interest Rate
-            model = BlackScholesModel(S, K, T, value, v, option_type)
-
-        sensitivity_prices.append(model.option_price())
-        greek_vals = model.greeks()
-        for i, greek in enumerate(['delta', 'gamma', 'theta', 'vega', 'rho']):
-            sensitivity_greeks[greek].append(greek_vals[i])
+    if backend == 'finite_difference' and sensitivity_variable == 'Spot Price':
+        # One PDE solve covers the whole spot sweep
+        sensitivity_prices, greek_vals = spot_curve_price_and_greeks(sensitivity_values, K, T, r, v, option_type,
+                                                                     american)
+    else:
+        # Calculate option prices and Greeks for all sensitivity values in one batched evaluation
+        params = {'S': S, 'K': K, 'T': T, 'r': r, 'v': v}
+        params[SENSITIVITY_PARAMS[sensitivity_variable]] = sensitivity_values
+        model = BlackScholesModel(**params, option_type=option_type)
+        sensitivity_prices, greek_vals = model.price_and_greeks()
+    sensitivity_greeks = {greek: greek_vals[i] for i, greek in enumerate(GREEK_NAMES)}
 
     return sensitivity_values, sensitivity_prices, sensitivity_greeks
 
+
+@timed('sensitivity.surface')
+def run_sensitivity_surface(S, K, T, r, v, option_type, x_variable, x_values, y_variable, y_values,
+                            max_tile_points=250_000):
+    # Price and Greeks over the full y-by-x grid, one broadcasted evaluation per tile of rows.
+    # Each tile holds at most max_tile_points grid points, which bounds the temporaries of large grids.
+    x_values, y_values = np.asarray(x_values, dtype=float), np.asarray(y_values, dtype=float)
+    shape = (len(y_values), len(x_values))
+    surface_prices = np.empty(shape)
+    surface_greeks = {greek: np.empty(shape) for greek in GREEK_NAMES}
+
+    rows_per_tile = max(1, max_tile_points // len(x_values))
+    for start in range(0, len(y_values), rows_per_tile):
+        stop = min(start + rows_per_tile, len(y_values))
+        params = {'S': S, 'K': K, 'T': T, 'r': r, 'v': v}
+        params[SENSITIVITY_PARAMS[x_variable]] = x_values[np.newaxis, :]
+        params[SENSITIVITY_PARAMS[y_variable]] = y_values[start:stop, np.newaxis]
+        model = BlackScholesModel(**params, option_type=option_type)
+
+        price, greek_vals = model.price_and_greeks()
+        surface_prices[start:stop] = price
+        for i, greek in enumerate(GREEK_NAMES):
+            surface_greeks[greek][start:stop] = greek_vals[i]
+
+    return surface_prices, surface_greeks
+
+
+@timed('figure.sensitivity')
 def plot_sensitivity_analysis(sensitivity_values, sensitivity_prices, sensitivity_greeks, sensitivity_variable):
+    import plotly.graph_objects as go
+
     # Create sensitivity analysis plots
     fig_price = go.Figure()
     fig_price.add_trace(go.Scatter(x=sensitivity_values, y=sensitivity_prices, mode='lines', name='Option Price'))
@@ -219,3 +252,21 @@ def plot_sensitivity_analysis(sensitivity_values, sensitivity_prices, sensitivit
                               template='plotly_white')
 
     return fig_price, fig_greeks
+
+
+@timed('figure.sensitivity_surface')
+def plot_sensitivity_surface(x_values, y_values, surface, x_variable, y_variable, output_name, chart_type='Heatmap'):
+    # Render one price or Greek surface as a heatmap or a 3-D surface
+    import plotly.graph_objects as go
+
+    if chart_type == 'Heatmap':
+        fig = go.Figure(data=go.Heatmap(x=x_values, y=y_values, z=surface, colorscale='Viridis',
+                                        colorbar=dict(title=output_name)))
+        fig.update_layout(xaxis_title=x_variable, yaxis_title=y_variable)
+    else:
+        fig = go.Figure(data=go.Surface(x=x_values, y=y_values, z=surface, colorscale='Viridis'))
+        fig.update_layout(scene=dict(xaxis_title=x_variable, yaxis_title=y_variable, zaxis_title=output_name),
+                          height=600)
+
+    fig.update_layout(title=f'{output_name} Surface over {x_variable} and {y_variable}', template='plotly_white')
+    return fig
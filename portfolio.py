@@ -0,0 +1,68 @@
+import numpy as np
+
+from option_analysis import BlackScholesModel, GREEK_NAMES, _call_mask
+
+
+class OptionPortfolio:
+    """Book of option positions stored column-wise (one contiguous array per field).
+
+    Rows are sorted by underlying so each underlying owns one contiguous slice. Price and Greeks
+    are kept per row; moving one underlying's spot or vol only revalues that underlying's slice.
+    """
+
+    def __init__(self, underlying, S, K, T, r, v, option_type, quantity):
+        underlying = np.asarray(underlying)
+        order = np.argsort(underlying, kind='stable')
+        n = len(underlying)
+
+        def column(values, dtype=float):
+            return np.ascontiguousarray(np.broadcast_to(np.asarray(values, dtype=dtype), (n,))[order])
+
+        self.underlying = underlying[order]
+        self.S = column(S)
+        self.K = column(K)
+        self.T = column(T)
+        self.r = column(r)
+        self.v = column(v)
+        self.is_call = column(_call_mask(option_type), dtype=bool)
+        self.quantity = column(quantity)
+
+        # Underlying name -> slice of its contiguous rows
+        self.names, starts = np.unique(self.underlying, return_index=True)
+        stops = np.append(starts[1:], n)
+        self.groups = {name: slice(start, stop) for name, start, stop in zip(self.names, starts, stops)}
+        self.group_starts = starts
+
+        self.prices = np.empty(n)
+        self.greeks = {greek: np.empty(n) for greek in GREEK_NAMES}
+        self._revalue(slice(0, n))
+
+    def __len__(self):
+        return len(self.S)
+
+    def _revalue(self, rows):
+        model = BlackScholesModel(self.S[rows], self.K[rows], self.T[rows], self.r[rows], self.v[rows],
+                                  self.is_call[rows])
+        price, greek_vals = model.price_and_greeks()
+        self.prices[rows] = price
+        for i, greek in enumerate(GREEK_NAMES):
+            self.greeks[greek][rows] = greek_vals[i]
+
+    def update_underlying(self, name, spot=None, vol=None):
+        # Move one underlying's spot and/or vol (scalar, or one value per row) and revalue only its rows
+        rows = self.groups[name]
+        if spot is not None:
+            self.S[rows] = spot
+        if vol is not None:
+            self.v[rows] = vol
+        self._revalue(rows)
+
+    def totals_by_underlying(self):
+        # Position-weighted price and Greek totals, summed over each underlying's contiguous slice
+        columns = {'price': self.prices, **self.greeks}
+        sums = {key: np.add.reduceat(self.quantity * values, self.group_starts) for key, values in columns.items()}
+        return {name: {key: total[i] for key, total in sums.items()} for i, name in enumerate(self.names)}
+
+    def book_totals(self):
+        columns = {'price': self.prices, **self.greeks}
+        return {key: np.dot(self.quantity, values) for key, values in columns.items()}
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from instrumentation import count
+
+
+def _normalize(value):
+    # Reduce equivalent inputs (300 vs 300.0 vs np.float64(300), 'Call' vs 'call') to one hashable form
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        return ('ndarray', value.shape, value.dtype.str, hashlib.sha1(value.tobytes()).hexdigest())
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _normalize(item)) for key, item in value.items()))
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, (bool, np.bool_)) or value is None:
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    return repr(value)
+
+
+_MISSING = object()
+
+
+class PricingCache:
+    """LRU cache for pricing results keyed by engine name and normalized inputs.
+
+    Keeps at most max_entries results in memory. With cache_dir set, results are also pickled to
+    disk and reloaded on a memory miss, so they survive restarts; the directory keeps at most
+    max_disk_entries files, evicting the least recently used. Safe to share between threads.
+    """
+
+    def __init__(self, max_entries=128, cache_dir=None, max_disk_entries=1024):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()  # guards entries and the hit/miss counters
+        self.hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(engine, **params):
+        return (engine, _normalize(params))
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f'{digest}.pkl')
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self.entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self.entries.move_to_end(key)
+                self.hits += 1
+        if value is not _MISSING:
+            count('cache_hits')
+            return value
+
+        value = self._load(key) if self.cache_dir else _MISSING
+        with self._lock:
+            if value is not _MISSING:
+                self._store(key, value)
+                self.hits += 1
+            else:
+                self.misses += 1
+        count('cache_hits' if value is not _MISSING else 'cache_misses')
+        return default if value is _MISSING else value
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+        if self.cache_dir:
+            # Write then rename so a crash never leaves a truncated entry behind; the temporary name is
+            # unique per thread so concurrent writers of the same key do not clobber each other
+            path = self._path(key)
+            temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temporary, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+            self._evict_disk()
+
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)  # modification time doubles as last use for disk eviction
+        except FileNotFoundError:  # not cached, or evicted by another thread or process
+            return _MISSING
+        return value
+
+    def _evict_disk(self):
+        # Remove the least recently used files beyond max_disk_entries
+        paths = [entry.path for entry in os.scandir(self.cache_dir) if entry.name.endswith('.pkl')]
+        if len(paths) <= self.max_disk_entries:
+            return
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.path.getmtime(path)
+            except FileNotFoundError:
+                pass
+        for path in sorted(mtimes, key=mtimes.get)[:len(mtimes) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _store(self, key, value):
+        # Caller holds self._lock
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_or_compute(self, engine, compute, **params):
+        # Return the cached result for these inputs, calling compute(**params) only on a miss
+        key = self.make_key(engine, **params)
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute(**params)
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            hits, misses, entries = self.hits, self.misses, len(self.entries)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'max_entries': self.max_entries,
+        }
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,208 @@
+"""Local HTTP/JSON pricing service with micro-batching.
+
+Endpoints (POST, JSON body with S, K, T, r, v, option_type):
+    /price        -> {"price": ...}
+    /greeks       -> {"price": ..., "delta": ..., "gamma": ..., "theta": ..., "vega": ..., "rho": ...}
+    /monte_carlo  -> {"price": ..., "std_error": ..., "num_paths": ...}  (optional num_simulations, seed)
+
+Concurrent /price and /greeks requests are gathered into micro-batches, closed by size or after a few
+milliseconds, and each batch is priced with one vectorized BlackScholesModel call. Monte Carlo jobs run
+in a process pool so they never block the event loop.
+
+Run:  python pricing_service.py --port 8000
+"""
+import argparse
+import asyncio
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from monte_carlo import MonteCarloOptionPricing
+from option_analysis import BlackScholesModel, GREEK_NAMES
+
+OPTION_FIELDS = ('S', 'K', 'T', 'r', 'v')
+ENDPOINTS = ('/price', '/greeks', '/monte_carlo')
+MAX_MC_SIMULATIONS = 10_000_000
+
+
+class MicroBatcher:
+    """Collects single-option requests and prices them together once max_batch_size are waiting
+    or max_wait seconds have passed since the first one arrived."""
+
+    def __init__(self, max_batch_size=512, max_wait=0.002):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, option):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((option, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                self._evaluate(batch)
+            except Exception as error:  # fail this batch's requests, keep the batcher alive
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    def _evaluate(self, batch):
+        options = [option for option, _ in batch]
+        columns = {field: np.array([option[field] for option in options], dtype=float) for field in OPTION_FIELDS}
+        is_call = np.array([option['option_type'] == 'call' for option in options])
+        price, greeks = BlackScholesModel(**columns, option_type=is_call).price_and_greeks()
+
+        self.batches += 1
+        self.requests += len(batch)
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                result = {'price': float(price[i])}
+                result.update({greek: float(values[i]) for greek, values in zip(GREEK_NAMES, greeks)})
+                future.set_result(result)
+
+
+def parse_option(body):
+    option = {field: float(body[field]) for field in OPTION_FIELDS}
+    if not all(math.isfinite(value) for value in option.values()):
+        raise ValueError('S, K, T, r and v must be finite numbers')
+    option['option_type'] = str(body.get('option_type', 'put')).lower()
+    if option['option_type'] not in ('call', 'put'):
+        raise ValueError("option_type must be 'call' or 'put'")
+    if min(option['S'], option['K'], option['T'], option['v']) <= 0:
+        raise ValueError('S, K, T and v must be positive')
+    return option
+
+
+def parse_int(body, field, default):
+    # JSON numbers arrive as int or float; 1e400 parses as inf, which int() cannot convert
+    value = body.get(field, default)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    try:
+        number = float(value)
+    except OverflowError:
+        number = math.inf
+    if not math.isfinite(number) or not number.is_integer():
+        raise ValueError(f'{field} must be a finite integer')
+    return int(number)
+
+
+def monte_carlo_job(option, num_simulations, seed):
+    mc = MonteCarloOptionPricing(option['S'], option['K'], option['T'], option['r'], option['v'],
+                                 option['option_type'], num_simulations, seed=seed)
+    price, std_error, _, num_paths = mc.simulate_streaming()
+    return {'price': float(price), 'std_error': float(std_error), 'num_paths': int(num_paths)}
+
+
+class PricingService:
+    def __init__(self, max_batch_size=512, max_wait=0.002, mc_workers=None):
+        self.batcher = MicroBatcher(max_batch_size, max_wait)
+        self.mc_pool = ProcessPoolExecutor(max_workers=mc_workers)
+
+    async def handle(self, path, body):
+        option = parse_option(body)
+        if path == '/price':
+            return {'price': (await self.batcher.submit(option))['price']}
+        if path == '/greeks':
+            return await self.batcher.submit(option)
+        if path == '/monte_carlo':
+            num_simulations = min(parse_int(body, 'num_simulations', 100_000), MAX_MC_SIMULATIONS)
+            if num_simulations < 2:
+                raise ValueError('num_simulations must be at least 2 for a standard error')
+            seed = parse_int(body, 'seed', 42)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.mc_pool, monte_carlo_job, option, num_simulations, seed)
+
+    async def serve_connection(self, reader, writer):
+        # Minimal HTTP/1.1 with keep-alive: one JSON request and response at a time per connection
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                raw_body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, payload = await self._dispatch(method, path, raw_body)
+                data = json.dumps(payload, allow_nan=False).encode()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, raw_body):
+        if method == 'GET' and path == '/stats':
+            return '200 OK', {'batches': self.batcher.batches, 'requests': self.batcher.requests}
+        if path not in ENDPOINTS:
+            return '404 Not Found', {'error': f'unknown endpoint {path}'}
+        if method != 'POST':
+            return '405 Method Not Allowed', {'error': 'use POST'}
+        try:
+            result = await self.handle(path, json.loads(raw_body or b'{}'))
+        except (KeyError, TypeError, ValueError) as error:
+            return '400 Bad Request', {'error': f'invalid request: {error}'}
+        except Exception as error:  # always answer, so no request drops the connection
+            return '500 Internal Server Error', {'error': f'internal error: {type(error).__name__}: {error}'}
+        # Finite inputs can still overflow (e.g. a huge negative rate); JSON has no NaN or Infinity
+        non_finite = [name for name, value in result.items() if isinstance(value, float) and not math.isfinite(value)]
+        if non_finite:
+            return '422 Unprocessable Entity', {'error': f"non-finite result for {', '.join(non_finite)}"}
+        return '200 OK', result
+
+    async def serve(self, host='127.0.0.1', port=8000):
+        batcher_task = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        print(f"Pricing service listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher_task.cancel()
+            self.mc_pool.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-batching Black-Scholes pricing service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=512)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--mc-workers', type=int, default=None)
+    args = parser.parse_args()
+
+    service = PricingService(args.max_batch_size, args.max_wait_ms / 1000, args.mc_workers)
+    asyncio.run(service.serve(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
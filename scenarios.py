@@ -0,0 +1,83 @@
+import itertools
+
+import numpy as np
+
+from option_analysis import BlackScholesModel, _call_mask
+
+# Shortest remaining life a time shift can leave, so expired positions price at (almost) intrinsic
+MIN_EXPIRY = 1e-10
+
+
+def scenario_grid(spot_shocks=(0.0,), vol_shocks=(0.0,), rate_shocks=(0.0,), time_shifts=(0.0,)):
+    """Cartesian product of shocks as flat arrays, one entry per scenario.
+
+    Spot shocks are relative (0.1 = +10%), vol and rate shocks are absolute (0.01 = +1 point),
+    and time shifts are the years that elapse.
+    """
+    grid = np.array(list(itertools.product(spot_shocks, vol_shocks, rate_shocks, time_shifts)), dtype=float)
+    return {'spot': grid[:, 0], 'vol': grid[:, 1], 'rate': grid[:, 2], 'time': grid[:, 3]}
+
+
+class ScenarioEngine:
+    """P&L of a set of option positions under a grid of spot, vol, rate and time shocks.
+
+    full_revaluation() reprices every position in every scenario; taylor_approximation() uses the
+    delta-gamma-vega-rho-theta expansion from the base Greeks. Both return a (scenarios x positions)
+    P&L matrix, weighted by quantity, and evaluate scenarios in tiles of bounded size.
+    """
+
+    def __init__(self, S, K, T, r, v, option_type, quantity=1.0, max_tile_points=1_000_000):
+        S = np.asarray(S, dtype=float)
+        n = S.size
+        self.S = S.ravel()
+        self.K, self.T, self.r, self.v, self.quantity = (np.broadcast_to(np.asarray(x, dtype=float), (n,))
+                                                         for x in (K, T, r, v, quantity))
+        self.is_call = np.broadcast_to(_call_mask(option_type), (n,))
+        self.max_tile_points = max_tile_points
+
+        base = BlackScholesModel(self.S, self.K, self.T, self.r, self.v, self.is_call)
+        self.base_prices, (self.delta, self.gamma, self.theta, self.vega, self.rho) = base.price_and_greeks()
+
+    @classmethod
+    def from_portfolio(cls, portfolio, **kwargs):
+        return cls(portfolio.S, portfolio.K, portfolio.T, portfolio.r, portfolio.v, portfolio.is_call,
+                   portfolio.quantity, **kwargs)
+
+    def _tiles(self, scenarios):
+        # Row blocks of scenarios holding at most max_tile_points scenario-position pairs each
+        num_scenarios = len(scenarios['spot'])
+        rows_per_tile = max(1, self.max_tile_points // max(len(self.S), 1))
+        for start in range(0, num_scenarios, rows_per_tile):
+            stop = min(start + rows_per_tile, num_scenarios)
+            yield slice(start, stop), {key: values[start:stop, np.newaxis] for key, values in scenarios.items()}
+
+    def full_revaluation(self, scenarios):
+        pnl = np.empty((len(scenarios['spot']), len(self.S)))
+        for rows, shock in self._tiles(scenarios):
+            model = BlackScholesModel(self.S * (1 + shock['spot']), self.K,
+                                      np.maximum(self.T - shock['time'], MIN_EXPIRY),
+                                      self.r + shock['rate'], np.maximum(self.v + shock['vol'], 1e-8), self.is_call)
+            pnl[rows] = self.quantity * (model.option_price() - self.base_prices)
+        return pnl
+
+    def taylor_approximation(self, scenarios):
+        pnl = np.empty((len(scenarios['spot']), len(self.S)))
+        for rows, shock in self._tiles(scenarios):
+            dS = self.S * shock['spot']
+            dt = np.minimum(shock['time'], self.T)
+            pnl[rows] = self.quantity * (self.delta * dS + 0.5 * self.gamma * dS**2 + self.vega * shock['vol'] +
+                                         self.rho * shock['rate'] + self.theta * dt)
+        return pnl
+
+    def approximation_error(self, scenarios):
+        # Taylor P&L against full revaluation, per position and for the whole book in each scenario
+        full = self.full_revaluation(scenarios)
+        approx = self.taylor_approximation(scenarios)
+        error = approx - full
+        book_error = error.sum(axis=1)
+        return full, approx, {
+            'max_abs_error': np.max(np.abs(error)),
+            'rms_error': np.sqrt(np.mean(error**2)),
+            'max_abs_book_error': np.max(np.abs(book_error)),
+            'max_relative_book_error': np.max(np.abs(book_error) / np.maximum(np.abs(full.sum(axis=1)), 1e-12)),
+        }
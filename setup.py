@@ -4,7 +4,7 @@ setup(
     name='blackscholesmodel',
     version='0.1',
     install_requires=[
-        'streamlit',
+        'streamlit>=1.55',  # st.tabs(on_change=...) and TabContainer.open
         'numpy==1.23.1',
         'pandas',
         'sympy',
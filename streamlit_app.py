@@ -1,11 +1,15 @@
+import json
+import os
+from contextlib import nullcontext
 import streamlit as st
-import numpy as np
-import plotly.graph_objects as go
-from option_analysis import BlackScholesModel, OptionPlotter, run_sensitivity_analysis, plot_sensitivity_analysis
+from option_analysis import BlackScholesModel, OptionPlotter, run_sensitivity_analysis, plot_sensitivity_analysis, \
+    run_sensitivity_surface, plot_sensitivity_surface, sensitivity_axis, SENSITIVITY_RANGES, GREEK_NAMES
 from user_input import get_user_input
 from description import description_page, about_me
 from monte_carlo import MonteCarloOptionPricing  # Import the Monte Carlo class
-import pandas as pd
+from pricing_cache import PricingCache
+from instrumentation import recording, span
+from visualization import DOWNSAMPLERS, bin_values, fan_columns, quantile_fan, plot_quantile_fan
 
 
 
@@ -21,94 +25,231 @@ st.set_page_config(
 st.sidebar.header("📊Black Scholes Option Model")
 
 
+@st.cache_resource
+def get_pricing_cache():
+    # One cache per server process; set PRICING_CACHE_DIR to persist results across restarts
+    return PricingCache(max_entries=int(os.environ.get('PRICING_CACHE_SIZE', 64)),
+                        cache_dir=os.environ.get('PRICING_CACHE_DIR'),
+                        max_disk_entries=int(os.environ.get('PRICING_CACHE_DISK_SIZE', 1024)))
+
+
+def compute_plot_values(S, K, T, r, v, option_type, x_variable, x_values, backend='black_scholes', american=False):
+    return OptionPlotter(S, K, T, r, v, option_type, x_variable, x_values, backend, american).generate_values()
+
+
+SPOT_ENGINES = {
+    'Black-Scholes (closed form)': ('black_scholes', False),
+    'Crank-Nicolson PDE (European)': ('finite_difference', False),
+    'Crank-Nicolson PDE (American)': ('finite_difference', True),
+}
+
+
+def spot_engine_input(key):
+    # Spot-axis curves can come from one PDE solve instead of the closed form; returns (backend, american)
+    engine = st.radio('Pricing Engine', tuple(SPOT_ENGINES), horizontal=True, key=key)
+    return SPOT_ENGINES[engine]
+
+
+def compute_monte_carlo_price(S, K, T, r, v, option_type, num_simulations, seed):
+    option_price_mc, final_prices, _ = MonteCarloOptionPricing(S, K, T, r, v, option_type, num_simulations,
+                                                               seed=seed).simulate()
+    return option_price_mc, final_prices
+
+
+def compute_monte_carlo_paths(S, K, T, r, v, option_type, num_paths, num_steps, seed):
+    mc_pricing = MonteCarloOptionPricing(S, K, T, r, v, option_type, num_paths, num_steps, seed)
+    return mc_pricing.generate_paths(), mc_pricing.time_grid()
+
+
+def compute_monte_carlo_fan(S, K, T, r, v, option_type, num_simulations, num_steps, seed):
+    # Quantile bands over every simulated path, evaluated at about one time step per pixel
+    mc_pricing = MonteCarloOptionPricing(S, K, T, r, v, option_type, num_simulations, num_steps, seed)
+    columns = fan_columns(num_steps)
+    return mc_pricing.time_grid()[columns], quantile_fan(mc_pricing.generate_paths(columns=columns))
+
+
+def compute_final_price_histogram(S, K, T, r, v, option_type, num_simulations, seed, bins=60):
+    option_price_mc, final_prices = compute_monte_carlo_price(S, K, T, r, v, option_type, num_simulations, seed)
+    return option_price_mc, bin_values(final_prices, bins)
+
+
+def sensitivity_axis_input(variable, num_points, key):
+    # Range inputs for one sensitivity axis, defaulting to the variable's standard sweep range
+    default_from, default_to = SENSITIVITY_RANGES[variable]
+    value_from = st.number_input(f'{variable} From', value=default_from, key=f'{key}_{variable}_from')
+    value_to = st.number_input(f'{variable} To', value=default_to, key=f'{key}_{variable}_to')
+    return sensitivity_axis(variable, num_points, (value_from, value_to))
+
+
+def diagnostics_panel(trace):
+    # Timings and counters of this script run, with downloads for offline profiling
+    with st.expander('Diagnostics', expanded=True):
+        st.dataframe(trace.summary(), hide_index=True)
+        st.write(trace.counters)
+        col_json, col_trace = st.columns(2)
+        col_json.download_button('Download JSON', json.dumps(trace.to_json()), file_name='diagnostics.json',
+                                 mime='application/json')
+        col_trace.download_button('Download Chrome Trace', json.dumps(trace.to_chrome_trace()),
+                                  file_name='trace.json', mime='application/json')
+
+
 def main_page():
     st.title('Black-Scholes Option Pricing')
     S, K, T, r, v, option_type, x_variable, x_values, show_greeks = get_user_input()
-
-    plotter = OptionPlotter(S, K, T, r, v, option_type, x_variable, x_values)
-    prices, greeks_vals = plotter.generate_values()
+    cache = get_pricing_cache()
+    base_params = dict(S=S, K=K, T=T, r=r, v=v, option_type=option_type)
 
     model = BlackScholesModel(S, K, T, r, v, option_type)
     st.write(f"### Option Price: ${model.option_price():.2f}")
 
-    greeks = model.greeks()
-    greeks_labels = ['Delta', 'Gamma', 'Theta', 'Vega', 'Rho']
+    # Create tabs for Greeks, Plot, Sensitivity Analysis, and Monte Carlo Simulation.
+    # Only the selected tab's body runs, so heavy imports and computations wait until a tab is opened.
+    tab_selection = st.tabs(['Option Greeks', 'Option Plot', 'Sensitivity Analysis', 'Monte Carlo Simulation'],
+                            key='main_tabs', on_change='rerun')
 
-    greeks_data = {
-        'Greek': greeks_labels,
-        'Value': [f"{value:.4f}" for value in greeks]
-    }
+    with tab_selection[0]:  # Greeks Tab
+        if tab_selection[0].open:
+            import pandas as pd
 
-    greeks_df = pd.DataFrame(greeks_data)
+            greeks = model.greeks()
+            greeks_labels = ['Delta', 'Gamma', 'Theta', 'Vega', 'Rho']
 
-    # Create tabs for Greeks, Plot, Sensitivity Analysis, and Monte Carlo Simulation
-    tab_selection = st.tabs(['Option Greeks', 'Option Plot', 'Sensitivity Analysis', 'Monte Carlo Simulation'])
+            greeks_data = {
+                'Greek': greeks_labels,
+                'Value': [f"{value:.4f}" for value in greeks]
+            }
 
-    with tab_selection[0]:  # Greeks Tab
-        st.write("### Option Greeks")
-        st.table(greeks_df)
+            greeks_df = pd.DataFrame(greeks_data)
+
+            st.write("### Option Greeks")
+            st.table(greeks_df)
+
+            higher_order_df = pd.DataFrame({
+                'Greek': ['Vanna', 'Volga', 'Charm', 'Speed', 'Zomma', 'Color'],
+                'Value': [f"{value:.6f}" for value in model.higher_order_greeks()]
+            })
+
+            st.write("### Second- and Third-Order Greeks")
+            st.table(higher_order_df)
 
     with tab_selection[1]:  # Plot Tab
-        st.write("### Option Value and Greeks Graph")
-        fig = plotter.plot(prices, greeks_vals, show_greeks)
-        st.plotly_chart(fig)
+        if tab_selection[1].open:
+            backend, american = spot_engine_input('plot_engine') if x_variable == 'S' else ('black_scholes', False)
+            plotter = OptionPlotter(S, K, T, r, v, option_type, x_variable, x_values, backend, american)
+            prices, greeks_vals = cache.get_or_compute('plotter_sweep', compute_plot_values, **base_params,
+                                                       x_variable=x_variable, x_values=x_values,
+                                                       backend=backend, american=american)
+
+            st.write("### Option Value and Greeks Graph")
+            fig = plotter.plot(prices, greeks_vals, show_greeks)
+            st.plotly_chart(fig)
 
     with tab_selection[2]:  # Sensitivity Analysis Tab
-        st.subheader('Sensitivity Analysis')
-        sensitivity_variable = st.selectbox(
-            'Select Variable for Sensitivity Analysis',
-            ('Spot Price', 'Strike Price', 'Volatility', 'Expiry Time', 'Interest Rate')
-        )
-        if sensitivity_variable:
-            sensitivity_values, sensitivity_prices, sensitivity_greeks = run_sensitivity_analysis(S, K, T, r, v, option_type, sensitivity_variable)
-            st.subheader(f'Sensitivity Analysis for {sensitivity_variable}')
-            fig_price, fig_greeks = plot_sensitivity_analysis(sensitivity_values, sensitivity_prices, sensitivity_greeks, sensitivity_variable)
-            st.plotly_chart(fig_price)
-            st.plotly_chart(fig_greeks)
+        if tab_selection[2].open:
+            st.subheader('Sensitivity Analysis')
+            sensitivity_mode = st.radio('Analysis Type', ('1-D Sweep', '2-D Surface'), horizontal=True)
+            variables = tuple(SENSITIVITY_RANGES)
+
+            if sensitivity_mode == '1-D Sweep':
+                sensitivity_variable = st.selectbox('Select Variable for Sensitivity Analysis', variables)
+                sensitivity_values = sensitivity_axis_input(sensitivity_variable, 100, key='sweep')
+                backend, american = spot_engine_input('sweep_engine') if sensitivity_variable == 'Spot Price' \
+                    else ('black_scholes', False)
+                sensitivity_values, sensitivity_prices, sensitivity_greeks = cache.get_or_compute(
+                    'sensitivity_sweep', run_sensitivity_analysis, **base_params,
+                    sensitivity_variable=sensitivity_variable, sensitivity_values=sensitivity_values,
+                    backend=backend, american=american)
+                st.subheader(f'Sensitivity Analysis for {sensitivity_variable}')
+                fig_price, fig_greeks = plot_sensitivity_analysis(sensitivity_values, sensitivity_prices, sensitivity_greeks, sensitivity_variable)
+                st.plotly_chart(fig_price)
+                st.plotly_chart(fig_greeks)
+            else:
+                col_x, col_y = st.columns(2)
+                with col_x:
+                    x_surface = st.selectbox('X-Axis Variable', variables, index=0)
+                with col_y:
+                    y_surface = st.selectbox('Y-Axis Variable', [var for var in variables if var != x_surface], index=1)
+                grid_points = st.slider('Grid Points per Axis', min_value=20, max_value=500, value=100, step=10)
+                with col_x:
+                    x_grid = sensitivity_axis_input(x_surface, grid_points, key='surface_x')
+                with col_y:
+                    y_grid = sensitivity_axis_input(y_surface, grid_points, key='surface_y')
+
+                output_name = st.selectbox('Surface Output', ['Price'] + [greek.capitalize() for greek in GREEK_NAMES])
+                chart_type = st.radio('Chart Type', ('Heatmap', '3-D Surface'), horizontal=True)
+
+                surface_prices, surface_greeks = cache.get_or_compute(
+                    'sensitivity_surface', run_sensitivity_surface, **base_params,
+                    x_variable=x_surface, x_values=x_grid, y_variable=y_surface, y_values=y_grid)
+                surface = surface_prices if output_name == 'Price' else surface_greeks[output_name.lower()]
+                st.plotly_chart(plot_sensitivity_surface(x_grid, y_grid, surface, x_surface, y_surface, output_name, chart_type))
 
     with tab_selection[3]:  # Monte Carlo Simulation Tab
-        st.subheader('Monte Carlo Simulation for Option Pricing')
-        num_simulations = st.number_input('Number of Simulations', min_value=1000, max_value=50000, value=10000, step=1000)
-        mc_pricing = MonteCarloOptionPricing(S, K, T, r, v, option_type, num_simulations)
+        if tab_selection[3].open:
+            st.subheader('Monte Carlo Simulation for Option Pricing')
+            num_simulations = st.number_input('Number of Simulations', min_value=1000, max_value=50000, value=10000, step=1000)
+            num_steps = st.number_input('Time Steps per Path', min_value=10, max_value=1000, value=252, step=10)
+            downsampler = st.radio('Sample Path Downsampling', tuple(DOWNSAMPLERS), horizontal=True)
+            seed = 42
         
-        # Get option price and paths
-        option_price_mc, final_prices, _ = mc_pricing.simulate()  # No need for antithetic in the main price
-        price_paths = mc_pricing.generate_paths()  # Generate paths for graphing
+            # Get option price and plot data; each is recomputed only when its own inputs change. Everything
+            # sent to the browser is reduced server-side to a fixed size, whatever the number of simulations.
+            option_price_mc, (bin_centers, bin_counts, bin_widths) = cache.get_or_compute(
+                'monte_carlo_histogram', compute_final_price_histogram, **base_params,
+                num_simulations=num_simulations, seed=seed)
+            fan_time, fan_bands = cache.get_or_compute(
+                'monte_carlo_fan', compute_monte_carlo_fan, **base_params,
+                num_simulations=num_simulations, num_steps=num_steps, seed=seed)
+            price_paths, time_grid = cache.get_or_compute(  # Generate sample paths for graphing
+                'monte_carlo_paths', compute_monte_carlo_paths, **base_params,
+                num_paths=min(5, num_simulations), num_steps=num_steps, seed=seed)
         
-        st.write(f"### Monte Carlo Estimated Option Price: ${option_price_mc:.2f}")
+            st.write(f"### Monte Carlo Estimated Option Price: ${option_price_mc:.2f}")
         
-        # Plot simulated paths
-        st.write("### Simulated Asset Price Paths")
-        fig_paths = go.Figure()
-        
-        for i in range(min(5, num_simulations)):  # Plot a maximum of 5 paths for clarity
-            path = [S * np.exp((r - 0.5 * v ** 2) * (j / num_simulations) + v * np.sqrt(j / num_simulations) * np.random.normal()) for j in range(num_simulations)]
-            fig_paths.add_trace(go.Scatter(x=list(range(num_simulations)), y=path, mode='lines', name=f'Path {i + 1}', line=dict(width=1)))
+            import plotly.graph_objects as go
+
+            # Plot quantile bands of all paths, with a few sample paths decimated to the chart width
+            st.write("### Simulated Asset Price Paths")
+            sample_paths = [DOWNSAMPLERS[downsampler](time_grid, path) for path in price_paths]
+            fig_paths = plot_quantile_fan(fan_time, fan_bands, sample_paths=sample_paths)
+            fig_paths.update_layout(title='Simulated Asset Price Paths',
+                                     xaxis_title='Time (Years)',
+                                     yaxis_title='Asset Price',
+                                     height=400)
 
-        fig_paths.update_layout(title='Simulated Asset Price Paths',
-                                 xaxis_title='Time Steps',
-                                 yaxis_title='Asset Price',
-                                 height=400)
+            st.plotly_chart(fig_paths)
 
-        st.plotly_chart(fig_paths)
+            # Plot histogram of final prices, binned server-side
+            st.write("### Distribution of Option Prices")
+            fig_hist = go.Figure(data=[go.Bar(x=bin_centers, y=bin_counts, width=bin_widths)])
+            fig_hist.update_layout(title='Distribution of Option Prices',
+                                   xaxis_title='Option Price',
+                                   yaxis_title='Frequency',
+                                   bargap=0)
 
-        # Plot histogram of final prices
-        st.write("### Distribution of Option Prices")
-        fig_hist = go.Figure(data=[go.Histogram(x=final_prices, nbinsx=30)])
-        fig_hist.update_layout(title='Distribution of Option Prices',
-                               xaxis_title='Option Price',
-                               yaxis_title='Frequency')
+            st.plotly_chart(fig_hist)
 
-        st.plotly_chart(fig_hist)
+    cache_stats = cache.stats()
+    st.caption(f"Pricing cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+               f"{cache_stats['entries']}/{cache_stats['max_entries']} entries")
 
 # Main App
-tab_selection = st.tabs(['Option Pricing Model', 'Glossary', 'About Me'])
+tab_selection = st.tabs(['Option Pricing Model', 'Glossary', 'About Me'], key='app_tabs', on_change='rerun')
+
+show_diagnostics = st.sidebar.toggle('Show Diagnostics', key='show_diagnostics')
 
 with tab_selection[0]:
-    main_page()
+    # Records only this session's script run; with the toggle off, instrumented calls are no-ops
+    with recording() if show_diagnostics else nullcontext() as trace:
+        with span('app.main_page'):
+            main_page()  # always runs: it owns the sidebar inputs, and its own tabs render lazily
+    if show_diagnostics:
+        diagnostics_panel(trace)
 
 with tab_selection[1]:
-    description_page()
+    if tab_selection[1].open:
+        description_page()
 
 with tab_selection[2]:
-    about_me()
\ No newline at end of file
+    if tab_selection[2].open:
+        about_me()
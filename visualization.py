@@ -0,0 +1,85 @@
+import numpy as np
+
+from instrumentation import timed
+
+# Roughly the drawable width of a chart in the app, i.e. the most points a line can usefully show
+PLOT_WIDTH_PX = 800
+
+FAN_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def bin_values(values, bins=60):
+    # Histogram counts computed server-side, so the browser gets `bins` bars instead of every sample
+    counts, edges = np.histogram(values, bins=bins)
+    return (edges[:-1] + edges[1:]) / 2, counts, np.diff(edges)
+
+
+def downsample_minmax(x, y, num_pixels=PLOT_WIDTH_PX):
+    # Keep the minimum and maximum of each pixel-wide bucket, in x order, so spikes survive decimation
+    x, y = np.asarray(x), np.asarray(y)
+    if len(y) <= 2 * num_pixels:
+        return x, y
+    edges = np.linspace(0, len(y), num_pixels + 1).astype(int)
+    buckets = np.split(np.arange(len(y)), edges[1:-1])
+    keep = np.unique(np.concatenate([[b[np.argmin(y[b])], b[np.argmax(y[b])]] for b in buckets] + [[0, len(y) - 1]]))
+    return x[keep], y[keep]
+
+
+def downsample_lttb(x, y, num_points=PLOT_WIDTH_PX):
+    # Largest-Triangle-Three-Buckets: from each bucket keep the point forming the largest triangle with
+    # the previously kept point and the mean of the next bucket
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    n = len(y)
+    if num_points >= n or num_points < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, num_points - 1).astype(int)
+    keep = np.empty(num_points, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(num_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+        area = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous]) -
+                      (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+    return x[keep], y[keep]
+
+
+# Sample-path decimators selectable in the app: min/max keeps every spike, LTTB keeps the visual shape
+# of the line with exactly num_points points
+DOWNSAMPLERS = {'Min/Max': downsample_minmax, 'LTTB': downsample_lttb}
+
+
+def fan_columns(num_steps, num_points=PLOT_WIDTH_PX):
+    # Time-step indices (always including both ends) at which to evaluate quantile bands
+    return np.unique(np.linspace(0, num_steps, min(num_steps + 1, num_points)).astype(int))
+
+
+def quantile_fan(price_paths, quantiles=FAN_QUANTILES):
+    # Quantiles across all paths at each time column: one row per quantile
+    return np.quantile(price_paths, quantiles, axis=0)
+
+
+@timed('figure.monte_carlo_paths')
+def plot_quantile_fan(time_grid, bands, quantiles=FAN_QUANTILES, sample_paths=None):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    # Pair the outer quantiles inwards, shading each band between a lower and an upper quantile
+    for lower, upper in zip(range(len(quantiles) // 2), range(len(quantiles) - 1, len(quantiles) // 2 - 1, -1)):
+        label = f'{quantiles[lower]:.0%}-{quantiles[upper]:.0%}'
+        fig.add_trace(go.Scatter(x=time_grid, y=bands[upper], mode='lines', line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=time_grid, y=bands[lower], mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor=f'rgba(31, 119, 180, {0.15 + 0.15 * lower})', name=label))
+    if len(quantiles) % 2:
+        middle = len(quantiles) // 2
+        fig.add_trace(go.Scatter(x=time_grid, y=bands[middle], mode='lines', line=dict(color='rgb(31, 119, 180)'),
+                                 name=f'{quantiles[middle]:.0%} (median)'))
+
+    for i, (path_x, path_y) in enumerate(sample_paths or []):
+        fig.add_trace(go.Scatter(x=path_x, y=path_y, mode='lines', name=f'Path {i + 1}', line=dict(width=1)))
+    return fig